@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.security import verify_internal_api_key
+from app.services.profiler import profile_allocations, profile_cpu
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_internal_api_key)])
+
+
+@router.get("/profile/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(10, ge=1, le=1000),
+) -> PlainTextResponse:
+    seconds = min(seconds, get_settings().profiler_max_seconds)
+    collapsed = await profile_cpu(seconds, interval_ms / 1000)
+    filename = f"profile-{int(time.time())}.collapsed"
+    return PlainTextResponse(collapsed, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/profile/memory")
+async def memory_profile(
+    seconds: float = Query(10, gt=0),
+    limit: int = Query(25, ge=1, le=200),
+    frames: int = Query(1, ge=1, le=25),
+):
+    seconds = min(seconds, get_settings().profiler_max_seconds)
+    return {"seconds": seconds, **await profile_allocations(seconds, limit, frames)}
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, File, Form, Request, Response, UploadFile
 
 from app.core.security import verify_internal_api_key
@@ -15,13 +17,16 @@ async def resume_parse(
     response: Response,
     user_id: str = Form(...),
     file: UploadFile = File(...),
+    previous_parse_id: Optional[str] = Form(None),
     _: None = Depends(verify_internal_api_key),
 ) -> SuccessResponse:
     request.state.user_id = user_id
-    parsed_resume = await parse_resume(user_id, file)
+    outcome = await parse_resume(user_id, file, previous_parse_id)
     response.headers["X-User-Id"] = user_id
+    if outcome.parse_id:
+        response.headers["X-Parse-Id"] = outcome.parse_id
     return SuccessResponse(
         success=True,
         message="Resume parsed successfully",
-        data=parsed_resume,
+        data=outcome.resume,
     )
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import anyio
+
+from app.core.config import Settings
+from app.core.logging import get_logger
+from app.utils.validators import ServiceUnavailableError
+
+logger = get_logger(__name__)
+
+
+class CapacityMonitor:
+    """Tracks live saturation signals that drive the readiness probe."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.draining = False
+        self.rejecting_parses = False
+        self.saturated = False
+        self.loop_lag_ms = 0.0
+        self._llm_results: Deque[Tuple[float, Optional[int], bool]] = deque()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def reset(self) -> None:
+        self.draining = False
+        self.rejecting_parses = False
+        self.saturated = False
+        self.loop_lag_ms = 0.0
+        self._llm_results.clear()
+
+    @asynccontextmanager
+    async def track_parse(self) -> AsyncIterator[None]:
+        if self.rejecting_parses:
+            raise ServiceUnavailableError("Service is shutting down")
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    def record_llm_result(self, exc: Optional[BaseException] = None) -> None:
+        status_code = getattr(exc, "status_code", None) if exc is not None else None
+        self._llm_results.append((time.monotonic(), status_code, exc is not None))
+
+    async def probe_loop_lag(self, interval: float) -> None:
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+
+    def _llm_rates(self, window_seconds: float) -> Tuple[int, float, float]:
+        cutoff = time.monotonic() - window_seconds
+        while self._llm_results and self._llm_results[0][0] < cutoff:
+            self._llm_results.popleft()
+        total = len(self._llm_results)
+        if not total:
+            return 0, 0.0, 0.0
+        errors = sum(1 for _, _, failed in self._llm_results if failed)
+        rate_limited = sum(1 for _, status_code, _ in self._llm_results if status_code == 429)
+        return total, errors / total, rate_limited / total
+
+    def signals(self, settings: Settings) -> Dict[str, Any]:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter_stats = limiter.statistics()
+        llm_samples, llm_error_rate, llm_rate_limit_rate = self._llm_rates(settings.ready_llm_window_seconds)
+        return {
+            "in_flight_parses": self.in_flight,
+            "worker_threads_busy": limiter_stats.borrowed_tokens,
+            "worker_threads_total": int(limiter_stats.total_tokens),
+            "thread_queue_depth": limiter_stats.tasks_waiting,
+            "loop_lag_ms": round(self.loop_lag_ms, 2),
+            "llm_samples": llm_samples,
+            "llm_error_rate": round(llm_error_rate, 3),
+            "llm_rate_limit_rate": round(llm_rate_limit_rate, 3),
+        }
+
+    def evaluate(self, settings: Settings) -> Tuple[bool, List[str], Dict[str, Any]]:
+        """Return readiness, the limits currently exceeded and the raw signals.
+
+        Once saturated, every signal has to fall below ``ready_recovery_ratio``
+        of its limit before the instance reports ready again, so the probe does
+        not flap around a threshold.
+        """
+        signals = self.signals(settings)
+        if self.draining:
+            return False, ["draining"], signals
+
+        limits: Dict[str, float] = {
+            "in_flight_parses": settings.ready_max_in_flight_parses,
+            "thread_queue_depth": settings.ready_max_thread_queue_depth,
+            "loop_lag_ms": settings.ready_max_loop_lag_ms,
+        }
+        if signals["llm_samples"] >= settings.ready_llm_min_samples:
+            limits["llm_error_rate"] = settings.ready_max_llm_error_rate
+            limits["llm_rate_limit_rate"] = settings.ready_max_llm_rate_limit_rate
+
+        scale = settings.ready_recovery_ratio if self.saturated else 1.0
+        exceeded = [name for name, limit in limits.items() if signals[name] > limit * scale]
+
+        saturated = bool(exceeded)
+        if saturated != self.saturated:
+            logger.warning(
+                "capacity.saturated" if saturated else "capacity.recovered",
+                extra={"exceeded": exceeded, "signals": signals},
+            )
+            self.saturated = saturated
+        return not saturated, exceeded, signals
+
+    async def drain(self, prestop_seconds: float, timeout: float) -> bool:
+        """Fail readiness, then stop taking new parses and wait for in-flight ones.
+
+        New parses are still served for ``prestop_seconds``, so requests the
+        load balancer routes here before it notices the failing probe succeed.
+        """
+        self.draining = True
+        logger.info("capacity.draining", extra={"in_flight_parses": self.in_flight})
+        await asyncio.sleep(prestop_seconds)
+        self.rejecting_parses = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error("capacity.drain_timeout", extra={"in_flight_parses": self.in_flight})
+            return False
+        logger.info("capacity.drained")
+        return True
+
+
+capacity_monitor = CapacityMonitor()
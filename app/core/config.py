@@ -1,22 +1,85 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Set
+from typing import List, Literal, Optional, Set
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ModelRoute(BaseModel):
+    """A routing rule: documents within every set limit go to ``model`` (``LLM_MODEL`` when unset)."""
+
+    name: str
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    max_input_tokens: Optional[int] = None
+    max_pages: Optional[int] = None
+    max_sections: Optional[int] = None
+    max_links: Optional[int] = None
+
+
 class Settings(BaseSettings):
     groq_api_key: str
     internal_api_key: str
     max_file_size_mb: int
     allowed_file_types: str
 
+    ready_max_in_flight_parses: int = 32
+    ready_max_thread_queue_depth: int = 8
+    ready_max_loop_lag_ms: float = 250.0
+    ready_max_llm_error_rate: float = 0.5
+    ready_max_llm_rate_limit_rate: float = 0.2
+    ready_llm_window_seconds: float = 60.0
+    ready_llm_min_samples: int = 5
+    ready_recovery_ratio: float = 0.8
+    loop_lag_probe_interval_seconds: float = 0.5
+    shutdown_prestop_seconds: float = 5.0
+    shutdown_drain_timeout_seconds: float = 20.0
+
+    llm_model: str = "llama-3.1-8b-instant"
+    llm_fallback_models: str = ""
+    llm_timeout_seconds: float = 30.0
+    llm_hedge_enabled: bool = True
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_delay_seconds: float = 1.0
+    llm_hedge_min_samples: int = 20
+    llm_max_retries: int = 2
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 8.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    llm_output_format: Literal["full", "compact", "aliased"] = "full"
+    # No routes by default: every document goes to LLM_MODEL without a max_tokens cap.
+    llm_routes: List[ModelRoute] = []
+
+    pdf_max_pages: int = 20
+    pdf_max_chars: int = 60000
+    pdf_max_cpu_seconds: float = 5.0
+    pdf_max_page_content_bytes: int = 2 * 1024 * 1024
+
+    incremental_parse_enabled: bool = False
+    parse_store_path: str = "parse_store.sqlite3"
+    parse_store_max_per_user: int = 5
+    parse_store_ttl_seconds: int = 7 * 24 * 3600
+
+    profiler_max_seconds: int = 60
+
+    trace_capture_enabled: bool = False
+    trace_capture_sample_rate: float = 0.01
+    trace_capture_dir: str = "traces"
+    trace_capture_max_files: int = 7
+
     model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore")
 
     def allowed_file_type_set(self) -> Set[str]:
         return {item.strip().lower() for item in self.allowed_file_types.split(",") if item.strip()}
 
+    def llm_model_chain(self, primary: Optional[str] = None) -> List[str]:
+        primary = primary or self.llm_model
+        fallbacks = [item.strip() for item in self.llm_fallback_models.split(",") if item.strip()]
+        return [primary] + [model for model in fallbacks if model != primary]
+
 
 @lru_cache
 def get_settings() -> Settings:
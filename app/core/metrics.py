@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+# Number of recent observations kept per timing series; enough for stable p99s
+# without unbounded growth in a long-lived process.
+_TIMING_WINDOW = 512
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Metrics:
+    """Process-local counters and timing windows, exported by ``GET /metrics``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Deque[float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            self._timings.setdefault(name, deque(maxlen=_TIMING_WINDOW)).append(value_ms)
+
+    def percentile(self, name: str, percentile: float) -> Tuple[int, float]:
+        with self._lock:
+            values = sorted(self._timings.get(name, ()))
+        return len(values), _percentile(values, percentile)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: sorted(values) for name, values in self._timings.items()}
+        return {
+            "counters": counters,
+            "timings_ms": {
+                name: {
+                    "count": len(values),
+                    "p50": round(_percentile(values, 50), 2),
+                    "p95": round(_percentile(values, 95), 2),
+                    "p99": round(_percentile(values, 99), 2),
+                }
+                for name, values in timings.items()
+            },
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import importlib
+import time
+
+import anyio
+
+from app.core.logging import get_logger
+
+# Heavy dependencies that are imported lazily by the request path. Importing
+# them here, off the event loop, moves the cost out of process start-up while
+# still keeping it off the first request.
+HEAVY_MODULES = (
+    "pdfplumber",
+    "docx",
+    "langchain_core.messages",
+    "langchain_groq",
+)
+
+logger = get_logger(__name__)
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self.ready = False
+        self.failed = False
+
+    def reset(self) -> None:
+        self.ready = False
+        self.failed = False
+
+
+warmup_state = WarmupState()
+
+
+async def warm_up() -> None:
+    start_time = time.perf_counter()
+    timings = {}
+    try:
+        for module_name in HEAVY_MODULES:
+            module_start = time.perf_counter()
+            await anyio.to_thread.run_sync(importlib.import_module, module_name)
+            timings[module_name] = round((time.perf_counter() - module_start) * 1000, 2)
+    except Exception as exc:
+        warmup_state.failed = True
+        logger.error("startup.warmup_failed", extra={"error": str(exc), "error_type": type(exc).__name__})
+        return
+
+    warmup_state.ready = True
+    logger.info(
+        "startup.warmup_completed",
+        extra={"duration_ms": round((time.perf_counter() - start_time) * 1000, 2), "module_ms": timings},
+    )
@@ -1,27 +1,97 @@
 from __future__ import annotations
 
+import asyncio
+import signal
+import threading
 import time
 import uuid
-from typing import Any
+from contextlib import asynccontextmanager
+from types import FrameType
+from typing import Any, AsyncIterator, Optional, Set
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from app.api.routes.admin import router as admin_router
 from app.api.routes.resume import router as resume_router
+from app.core.capacity import capacity_monitor
+from app.core.config import Settings, get_settings
 from app.core.logging import get_logger, setup_logging
+from app.core.metrics import metrics
+from app.core.security import verify_internal_api_key
+from app.core.warmup import warm_up, warmup_state
 from app.schemas.response_schema import ErrorResponse
 from app.utils.validators import (
     FileTooLargeError,
     InvalidAPIKeyError,
     InvalidFileTypeError,
     ParsingError,
+    ProfilerBusyError,
+    ServiceUnavailableError,
 )
 
 setup_logging()
 logger = get_logger(__name__)
 
-app = FastAPI()
+
+def _drain_on_sigterm(settings: Settings) -> None:
+    """Drain before uvicorn sees SIGTERM.
+
+    uvicorn closes its sockets and waits for open requests as soon as it
+    handles SIGTERM, and only then runs the lifespan shutdown, so draining
+    has to start from the signal itself. The handler fails readiness, waits
+    out the pre-stop delay and the in-flight parses, then passes the signal on
+    to uvicorn. A second SIGTERM is passed on immediately.
+    """
+    # Signal handlers can only be installed from the main thread (not under the test client).
+    if threading.current_thread() is not threading.main_thread():
+        return
+    server_handler = signal.getsignal(signal.SIGTERM)
+    if not callable(server_handler):
+        return
+    loop = asyncio.get_running_loop()
+    drain_tasks: Set[asyncio.Task] = set()
+
+    async def drain_then_exit(signum: int, frame: Optional[FrameType]) -> None:
+        await capacity_monitor.drain(settings.shutdown_prestop_seconds, settings.shutdown_drain_timeout_seconds)
+        server_handler(signum, frame)
+
+    def start_drain(signum: int, frame: Optional[FrameType]) -> None:
+        task = loop.create_task(drain_then_exit(signum, frame))
+        drain_tasks.add(task)
+        task.add_done_callback(drain_tasks.discard)
+
+    def handle_sigterm(signum: int, frame: Optional[FrameType]) -> None:
+        if capacity_monitor.draining:
+            server_handler(signum, frame)
+            return
+        capacity_monitor.draining = True
+        loop.call_soon_threadsafe(start_drain, signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    warmup_state.reset()
+    capacity_monitor.reset()
+    _drain_on_sigterm(settings)
+    warmup_task = asyncio.create_task(warm_up())
+    lag_probe_task = asyncio.create_task(
+        capacity_monitor.probe_loop_lag(settings.loop_lag_probe_interval_seconds)
+    )
+    try:
+        yield
+    finally:
+        for task in (warmup_task, lag_probe_task):
+            if not task.done():
+                task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(resume_router)
+app.include_router(admin_router)
 
 
 @app.middleware("http")
@@ -102,6 +172,28 @@ async def parsing_error_handler(request: Request, exc: ParsingError):
     return _error_response("Parsing failed", str(exc), 500)
 
 
+@app.exception_handler(ServiceUnavailableError)
+async def service_unavailable_handler(request: Request, exc: ServiceUnavailableError):
+    logger.error(
+        "server.unavailable",
+        extra={
+            "request_id": getattr(request.state, "request_id", None),
+            "user_id": getattr(request.state, "user_id", None),
+            "error": str(exc),
+        },
+    )
+    return _error_response("Service unavailable", str(exc), 503)
+
+
+@app.exception_handler(ProfilerBusyError)
+async def profiler_busy_handler(request: Request, exc: ProfilerBusyError):
+    logger.warning(
+        "profiler.busy",
+        extra={"request_id": getattr(request.state, "request_id", None), "error": str(exc)},
+    )
+    return _error_response("Profiler busy", str(exc), 409)
+
+
 @app.exception_handler(Exception)
 async def unexpected_error_handler(request: Request, exc: Exception):
     logger.error(
@@ -122,4 +214,16 @@ async def health_check():
 
 @app.get("/ready")
 async def readiness_check():
-    return {"status": "ready"}
+    if not warmup_state.ready:
+        status = "warmup_failed" if warmup_state.failed else "warming_up"
+        return JSONResponse(status_code=503, content={"status": status})
+    ready, exceeded, signals = capacity_monitor.evaluate(get_settings())
+    if not ready:
+        status = "draining" if capacity_monitor.draining else "saturated"
+        return JSONResponse(status_code=503, content={"status": status, "exceeded": exceeded, "signals": signals})
+    return {"status": "ready", "signals": signals}
+
+
+@app.get("/metrics")
+async def metrics_snapshot(_: None = Depends(verify_internal_api_key)):
+    return metrics.snapshot()
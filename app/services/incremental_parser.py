@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.schemas.resume_schema import ResumeSchema
+from app.services.llm_service import get_system_prompt, parse_resume_with_llm, prompt_version
+from app.services.parse_store import ParseStore, StoredParse
+from app.services.sections import HEADER_SECTION, field_owners, section_hash, split_sections
+from app.utils.tokens import estimate_tokens
+
+logger = get_logger(__name__)
+
+
+@lru_cache
+def get_parse_store() -> ParseStore:
+    settings = get_settings()
+    return ParseStore(
+        settings.parse_store_path, settings.parse_store_max_per_user, settings.parse_store_ttl_seconds
+    )
+
+
+def _section_hashes(sections: Dict[str, str], hyperlinks: List[Dict[str, str]]) -> Dict[str, str]:
+    hashes = {kind: section_hash(text) for kind, text in sections.items()}
+    # Link-derived fields (linkedin, github, website) live in the header, so a
+    # changed link set invalidates it even when the visible text is identical.
+    links = "\n".join(f"{link.get('text', '')} {link.get('url', '')}" for link in hyperlinks)
+    hashes[HEADER_SECTION] = section_hash(f"{sections[HEADER_SECTION]}\n{links}")
+    return hashes
+
+
+def _fragments(result: Dict[str, Any], owners: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    fragments: Dict[str, Dict[str, Any]] = {}
+    for field, kind in owners.items():
+        fragments.setdefault(kind, {})[field] = result[field]
+    return fragments
+
+
+async def parse_incrementally(
+    user_id: str,
+    resume_text: str,
+    hyperlinks: List[Dict[str, str]],
+    previous_parse_id: Optional[str] = None,
+    page_count: Optional[int] = None,
+) -> Tuple[ResumeSchema, str]:
+    """Parse a resume, re-sending only sections that changed since a previous parse.
+
+    The previous parse is ``previous_parse_id`` when given, otherwise the
+    latest parse stored for ``user_id``. Sections whose hash is unchanged keep
+    their stored fragments; the rest are sent to the LLM together and merged
+    with them. A full parse is done when there is no previous parse, when the
+    set of sections differs (field ownership may have moved), or when the
+    previous parse was made with a different prompt or output format.
+    """
+    store = get_parse_store()
+    sections = split_sections(resume_text)
+    hashes = _section_hashes(sections, hyperlinks)
+    owners = field_owners(list(sections))
+    version = prompt_version(get_system_prompt(get_settings().llm_output_format))
+
+    previous = await store.load(user_id, previous_parse_id)
+    if previous_parse_id and previous is None:
+        logger.warning("incremental.previous_not_found", extra={"user_id": user_id, "parse_id": previous_parse_id})
+
+    full_tokens = estimate_tokens(resume_text)
+    if (
+        previous is None
+        or previous.prompt_version != version
+        or set(previous.section_hashes()) != set(hashes)
+    ):
+        mode = "full"
+        changed = list(sections)
+        result = (await parse_resume_with_llm(resume_text, hyperlinks, page_count)).model_dump()
+    else:
+        changed = [kind for kind, value in hashes.items() if previous.section_hashes()[kind] != value]
+        fresh: Dict[str, Any] = {}
+        if changed:
+            mode = "partial"
+            partial_text = "\n\n".join(sections[kind] for kind in sections if kind in changed)
+            # The page count of the whole document does not describe the partial
+            # text, so routing falls back to its size estimate.
+            fresh = (await parse_resume_with_llm(partial_text, hyperlinks)).model_dump()
+        else:
+            mode = "reuse"
+        result = {
+            field: fresh[field] if kind in changed else previous.sections[kind]["fragment"][field]
+            for field, kind in owners.items()
+        }
+
+    resume = ResumeSchema.model_validate(result)
+    sent_tokens = sum(estimate_tokens(sections[kind]) for kind in changed) if mode != "full" else full_tokens
+    metrics.increment(f"incremental.{mode}")
+    metrics.increment("incremental.tokens_sent_estimate", sent_tokens)
+    metrics.increment("incremental.tokens_saved_estimate", full_tokens - sent_tokens)
+
+    fragments = _fragments(resume.model_dump(), owners)
+    stored = StoredParse(
+        parse_id=uuid.uuid4().hex,
+        prompt_version=version,
+        sections={kind: {"hash": hashes[kind], "fragment": fragments.get(kind, {})} for kind in sections},
+    )
+    await store.save(user_id, stored)
+
+    logger.info(
+        "incremental.parse_completed",
+        extra={
+            "user_id": user_id,
+            "mode": mode,
+            "parse_id": stored.parse_id,
+            "previous_parse_id": previous.parse_id if previous else None,
+            "prompt_changed": previous is not None and previous.prompt_version != version,
+            "changed_sections": changed,
+            "tokens_saved_estimate": full_tokens - sent_tokens,
+        },
+    )
+    return resume, stored.parse_id
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from app.core.capacity import capacity_monitor
+from app.core.config import Settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.utils.validators import ServiceUnavailableError
+
+logger = get_logger(__name__)
+
+LATENCY_SERIES = "llm.attempt_latency"
+
+
+def model_latency_series(model: str) -> str:
+    return f"llm.latency.{model}"
+
+
+class CircuitBreaker:
+    """Fails fast after consecutive provider failures.
+
+    After ``reset_seconds`` the breaker half-opens and lets a single probe
+    call through while other calls keep failing fast. A successful probe
+    closes the breaker; a failed one re-opens it for another period.
+    """
+
+    def __init__(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow(self, reset_seconds: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < reset_seconds:
+            return False
+        self.probing = True
+        self._probe_task = asyncio.current_task()
+        logger.info("llm.circuit_half_open")
+        return True
+
+    def release_probe(self) -> None:
+        """End the calling task's probe if it neither succeeded nor failed in a way that counts."""
+        if self.probing and self._probe_task is asyncio.current_task():
+            self.probing = False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("llm.circuit_closed")
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, threshold: int) -> None:
+        self.consecutive_failures += 1
+        if self.probing or self.consecutive_failures >= threshold:
+            if self.opened_at is None:
+                logger.error("llm.circuit_opened", extra={"consecutive_failures": self.consecutive_failures})
+                metrics.increment("llm.circuit.opened")
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status_code = getattr(exc, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    status_code = _status_code(exc)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    import groq
+
+    return isinstance(exc, groq.APIConnectionError)
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int, exc: BaseException, settings: Settings) -> float:
+    ceiling = min(settings.llm_backoff_max_seconds, settings.llm_backoff_base_seconds * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, settings.llm_backoff_max_seconds))
+    return delay
+
+
+class LLMRequestPolicy:
+    """Timeout, hedging, retry and fallback policy around a single LLM request."""
+
+    def __init__(self) -> None:
+        self.breaker = CircuitBreaker()
+
+    def hedge_delay(self, model: str, settings: Settings) -> Optional[float]:
+        """Latency percentile of ``model`` after which a hedge is sent, once it has enough samples."""
+        if not settings.llm_hedge_enabled:
+            return None
+        samples, latency_ms = metrics.percentile(model_latency_series(model), settings.llm_hedge_percentile)
+        if samples < settings.llm_hedge_min_samples:
+            return None
+        return max(settings.llm_hedge_min_delay_seconds, latency_ms / 1000)
+
+    async def _timed_call(self, invoke: Callable[[str], Awaitable[Any]], model: str, settings: Settings) -> Any:
+        start_time = time.perf_counter()
+        metrics.increment("llm.attempts")
+        try:
+            result = await asyncio.wait_for(invoke(model), timeout=settings.llm_timeout_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                metrics.increment("llm.timeouts")
+            capacity_monitor.record_llm_result(exc)
+            raise
+        self._observe_latency(model, (time.perf_counter() - start_time) * 1000)
+        capacity_monitor.record_llm_result()
+        return result
+
+    @staticmethod
+    def _observe_latency(model: str, latency_ms: float) -> None:
+        metrics.observe(LATENCY_SERIES, latency_ms)
+        metrics.observe(model_latency_series(model), latency_ms)
+
+    async def _hedged_call(self, invoke: Callable[[str], Awaitable[Any]], model: str, settings: Settings) -> Any:
+        start_time = time.perf_counter()
+        primary = asyncio.create_task(self._timed_call(invoke, model, settings))
+        pending = {primary}
+        hedge_won = False
+        try:
+            delay = self.hedge_delay(model, settings)
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    metrics.increment("llm.hedge.fired")
+                    logger.info("llm.hedge_fired", extra={"model": model, "delay_ms": round(delay * 1000, 2)})
+                    pending.add(asyncio.create_task(self._timed_call(invoke, model, settings)))
+                else:
+                    pending = done
+
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            hedge_won = True
+                            metrics.increment("llm.hedge.won")
+                        return task.result()
+                    first_error = first_error or task.exception()
+            assert first_error is not None
+            raise first_error
+        finally:
+            if hedge_won and primary in pending:
+                # The cancelled primary's elapsed time is a lower bound on its
+                # latency. Recording it keeps the slow requests that caused the
+                # hedge in the history, so the hedge delay does not drift down.
+                self._observe_latency(model, (time.perf_counter() - start_time) * 1000)
+            for task in pending:
+                task.cancel()
+
+    async def run(
+        self,
+        invoke: Callable[[str], Awaitable[Any]],
+        models: Sequence[str],
+        settings: Settings,
+    ) -> Any:
+        """Call ``invoke(model)`` under the policy and return the first successful result.
+
+        Each model in ``models`` gets up to ``llm_max_retries`` retries with
+        jittered exponential backoff on timeouts, connection errors, 429 and
+        5xx. Any other error, or running out of retries, moves on to the next
+        model. The last error is re-raised when every model fails.
+        """
+        if not self.breaker.allow(settings.llm_circuit_reset_seconds):
+            metrics.increment("llm.circuit.rejected")
+            raise ServiceUnavailableError("LLM provider unavailable")
+        try:
+            return await self._run(invoke, models, settings)
+        finally:
+            # A probe that ended without a recorded outcome (a non-retryable
+            # error or cancellation) must not keep the breaker half-open forever.
+            self.breaker.release_probe()
+
+    async def _run(
+        self,
+        invoke: Callable[[str], Awaitable[Any]],
+        models: Sequence[str],
+        settings: Settings,
+    ) -> Any:
+        last_error: Optional[BaseException] = None
+        for index, model in enumerate(models):
+            if index:
+                metrics.increment("llm.fallbacks")
+                logger.warning("llm.fallback", extra={"model": model, "previous_error": str(last_error)})
+            for attempt in range(settings.llm_max_retries + 1):
+                try:
+                    result = await self._hedged_call(invoke, model, settings)
+                except Exception as exc:
+                    last_error = exc
+                    retryable = _is_retryable(exc)
+                    if retryable:
+                        self.breaker.record_failure(settings.llm_circuit_failure_threshold)
+                    logger.warning(
+                        "llm.attempt_failed",
+                        extra={
+                            "model": model,
+                            "attempt": attempt,
+                            "status_code": _status_code(exc),
+                            "error_type": type(exc).__name__,
+                            "retryable": retryable,
+                        },
+                    )
+                    if not retryable or attempt == settings.llm_max_retries:
+                        break
+                    if not self.breaker.allow(settings.llm_circuit_reset_seconds):
+                        metrics.increment("llm.circuit.rejected")
+                        raise ServiceUnavailableError("LLM provider unavailable") from exc
+                    metrics.increment("llm.retries")
+                    await asyncio.sleep(_backoff_seconds(attempt, exc, settings))
+                    continue
+                self.breaker.record_success()
+                metrics.increment(f"llm.model.{model}")
+                return result
+
+        assert last_error is not None
+        raise last_error
+
+
+llm_request_policy = LLMRequestPolicy()
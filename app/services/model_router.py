@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from app.core.config import ModelRoute, Settings
+from app.services.sections import HEADER_SECTION, split_sections
+from app.utils.tokens import estimate_tokens
+
+# Rough characters per page, used when the document does not report a page count.
+_CHARS_PER_PAGE = 3000
+
+
+class DocumentFeatures:
+    """Cheap size and complexity features of an extracted resume."""
+
+    def __init__(self, chars: int, tokens: int, pages: int, sections: int, links: int) -> None:
+        self.chars = chars
+        self.tokens = tokens
+        self.pages = pages
+        self.sections = sections
+        self.links = links
+
+    @classmethod
+    def from_text(
+        cls,
+        text: str,
+        hyperlinks: Optional[List[Dict[str, str]]] = None,
+        page_count: Optional[int] = None,
+    ) -> DocumentFeatures:
+        sections = [kind for kind in split_sections(text) if kind != HEADER_SECTION]
+        return cls(
+            chars=len(text),
+            tokens=estimate_tokens(text),
+            pages=page_count or max(1, -(-len(text) // _CHARS_PER_PAGE)),
+            sections=len(sections),
+            links=len(hyperlinks or []),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def _within(value: int, limit: Optional[int]) -> bool:
+    return limit is None or value <= limit
+
+
+def select_route(features: DocumentFeatures, settings: Settings) -> Optional[ModelRoute]:
+    """Return the first configured route whose limits all admit ``features``."""
+    for route in settings.llm_routes:
+        if (
+            _within(features.tokens, route.max_input_tokens)
+            and _within(features.pages, route.max_pages)
+            and _within(features.sections, route.max_sections)
+            and _within(features.links, route.max_links)
+        ):
+            return route
+    return None
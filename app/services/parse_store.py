@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+import anyio
+
+# Bumped whenever the tables change. Stored parses are only a cache, so an
+# older store is dropped and recreated rather than migrated.
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+DROP TABLE IF EXISTS parse_sections;
+DROP TABLE IF EXISTS parses;
+CREATE TABLE parses (
+    parse_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    prompt_version TEXT NOT NULL
+);
+CREATE INDEX parses_user_created ON parses (user_id, created_at);
+CREATE TABLE parse_sections (
+    parse_id TEXT NOT NULL REFERENCES parses (parse_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    section_hash TEXT NOT NULL,
+    fragment TEXT NOT NULL,
+    PRIMARY KEY (parse_id, kind)
+);
+"""
+
+
+class StoredParse:
+    """A previous parse: for each section, its hash and the result fields it owns."""
+
+    def __init__(self, parse_id: str, prompt_version: str, sections: Dict[str, Dict[str, Any]]) -> None:
+        self.parse_id = parse_id
+        self.prompt_version = prompt_version
+        self.sections = sections
+
+    def section_hashes(self) -> Dict[str, str]:
+        return {kind: section["hash"] for kind, section in self.sections.items()}
+
+
+class ParseStore:
+    """SQLite store of previous parses, their section hashes and parsed fragments.
+
+    Every call opens its own connection so the store can be used from any
+    worker thread; the async wrappers run the blocking work off the event loop.
+    Parses older than ``ttl_seconds`` (0 keeps them) are never loaded and are
+    deleted on the next save.
+    """
+
+    def __init__(self, path: str, max_parses_per_user: int, ttl_seconds: int = 0) -> None:
+        self.path = path
+        self.max_parses_per_user = max_parses_per_user
+        self.ttl_seconds = ttl_seconds
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA foreign_keys = ON")
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode = WAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                connection.executescript(_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._initialized = True
+        return connection
+
+    def _oldest_kept(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def _load(self, user_id: str, parse_id: Optional[str]) -> Optional[StoredParse]:
+        with closing(self._connect()) as connection:
+            if parse_id:
+                row = connection.execute(
+                    "SELECT parse_id, prompt_version FROM parses "
+                    "WHERE parse_id = ? AND user_id = ? AND created_at >= ?",
+                    (parse_id, user_id, self._oldest_kept()),
+                ).fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT parse_id, prompt_version FROM parses WHERE user_id = ? AND created_at >= ? "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (user_id, self._oldest_kept()),
+                ).fetchone()
+            if row is None:
+                return None
+            sections = {
+                kind: {"hash": section_hash, "fragment": json.loads(fragment)}
+                for kind, section_hash, fragment in connection.execute(
+                    "SELECT kind, section_hash, fragment FROM parse_sections WHERE parse_id = ?",
+                    (row[0],),
+                )
+            }
+        return StoredParse(row[0], row[1], sections)
+
+    def _save(self, user_id: str, stored: StoredParse) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO parses (parse_id, user_id, created_at, prompt_version) VALUES (?, ?, ?, ?)",
+                (stored.parse_id, user_id, time.time(), stored.prompt_version),
+            )
+            connection.executemany(
+                "INSERT INTO parse_sections (parse_id, kind, section_hash, fragment) VALUES (?, ?, ?, ?)",
+                [
+                    (stored.parse_id, kind, section["hash"], json.dumps(section["fragment"], ensure_ascii=True))
+                    for kind, section in stored.sections.items()
+                ],
+            )
+            connection.execute(
+                "DELETE FROM parses WHERE user_id = ? AND parse_id NOT IN "
+                "(SELECT parse_id FROM parses WHERE user_id = ? ORDER BY created_at DESC LIMIT ?)",
+                (user_id, user_id, self.max_parses_per_user),
+            )
+            connection.execute("DELETE FROM parses WHERE created_at < ?", (self._oldest_kept(),))
+
+    async def load(self, user_id: str, parse_id: Optional[str] = None) -> Optional[StoredParse]:
+        """Load ``parse_id`` if given, otherwise the latest parse for ``user_id``."""
+        return await anyio.to_thread.run_sync(self._load, user_id, parse_id)
+
+    async def save(self, user_id: str, stored: StoredParse) -> None:
+        await anyio.to_thread.run_sync(self._save, user_id, stored)
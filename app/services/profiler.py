@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import linecache
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List
+
+import anyio
+
+from app.core.logging import get_logger
+from app.utils.validators import ProfilerBusyError
+
+logger = get_logger(__name__)
+
+# Held for the whole duration of a CPU or memory profile. No sampler thread
+# runs, and tracemalloc is not started, unless a profile is in progress.
+_profile_lock = threading.Lock()
+
+# Leaf frames of a thread that is blocked rather than running: lock and queue
+# waits, thread pool workers waiting for work, and an idle event loop.
+_IDLE_LEAVES = frozenset(
+    {
+        "threading:Condition.wait",
+        "threading:Thread._wait_for_tstate_lock",
+        "concurrent.futures.thread:_worker",
+        "selectors:EpollSelector.select",
+        "selectors:KqueueSelector.select",
+        "selectors:PollSelector.select",
+        "selectors:SelectSelector.select",
+    }
+)
+
+# Deepest Python frame of the main thread while an event loop implemented in C
+# (uvloop, which uvicorn[standard] uses) waits for events: the wait happens
+# below the loop's run entry point, so no selector frame is ever seen.
+_IDLE_LOOP_ENTRIES = frozenset(
+    {
+        "asyncio.runners:Runner.run",
+        "asyncio.base_events:BaseEventLoop.run_forever",
+    }
+)
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}".replace(";", ",")
+
+
+def _collapse(frame: FrameType | None) -> List[str]:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Samples the stacks of every other thread at a fixed interval.
+
+    Samples whose leaf frame is a known wait, or the main thread's event loop
+    entry point, are counted as idle and left out, so the profile shows where
+    threads spend time running rather than wall time. The result is in collapsed-stack format (``root;child;leaf count``
+    per line), which flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.samples: Counter[str] = Counter()
+        self.idle_samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        main_id = threading.main_thread().ident
+        while not self._stop.wait(self.interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                leaf = _frame_label(frame)
+                if leaf in _IDLE_LEAVES or (thread_id == main_id and leaf in _IDLE_LOOP_ENTRIES):
+                    self.idle_samples += 1
+                    continue
+                thread_name = thread_names.get(thread_id, str(thread_id)).replace(";", ",")
+                self.samples[";".join([thread_name] + _collapse(frame))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _acquire() -> None:
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+
+
+async def profile_cpu(seconds: float, interval_seconds: float) -> str:
+    _acquire()
+    try:
+        profiler = SamplingProfiler(interval_seconds)
+        logger.info("profiler.cpu_started", extra={"seconds": seconds, "interval_ms": interval_seconds * 1000})
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+        logger.info(
+            "profiler.cpu_completed",
+            extra={"samples": sum(profiler.samples.values()), "idle_samples": profiler.idle_samples},
+        )
+        return profiler.collapsed()
+    finally:
+        _profile_lock.release()
+
+
+def _top_allocations(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int
+) -> List[Dict[str, Any]]:
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, linecache.__file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "traceback")
+    return [
+        {
+            "size_diff_kb": round(stat.size_diff / 1024, 2),
+            "size_kb": round(stat.size / 1024, 2),
+            "count_diff": stat.count_diff,
+            "count": stat.count,
+            "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        }
+        for stat in stats[:limit]
+    ]
+
+
+async def profile_allocations(seconds: float, limit: int, frames: int) -> Dict[str, Any]:
+    """Diff two tracemalloc snapshots taken ``seconds`` apart, grouped by allocation site.
+
+    Snapshots and the diff run in a worker thread to keep them off the event
+    loop. Tracing that was already running (e.g. from PYTHONTRACEMALLOC) is
+    reused with its own frame limit and left running.
+    """
+    _acquire()
+    try:
+        external = tracemalloc.is_tracing()
+        logger.info("profiler.memory_started", extra={"seconds": seconds, "external_tracing": external})
+        if not external:
+            tracemalloc.start(frames)
+        try:
+            before = await anyio.to_thread.run_sync(tracemalloc.take_snapshot)
+            await asyncio.sleep(seconds)
+            after = await anyio.to_thread.run_sync(tracemalloc.take_snapshot)
+        finally:
+            if not external:
+                tracemalloc.stop()
+
+        top = await anyio.to_thread.run_sync(_top_allocations, before, after, limit)
+        logger.info("profiler.memory_completed", extra={"sites": len(top)})
+        return {"frames": before.traceback_limit, "top": top}
+    finally:
+        _profile_lock.release()
@@ -1,19 +1,41 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import UploadFile
 
+from app.core.capacity import capacity_monitor
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import metrics
 from app.schemas.resume_schema import ResumeSchema
+from app.services.incremental_parser import parse_incrementally
 from app.services.llm_service import parse_resume_with_llm
-from app.utils.file_handler import extract_text_with_links, read_upload_file
-from app.utils.hashing import sha256_bytes
+from app.services.model_router import DocumentFeatures
+from app.services.trace_capture import capture_trace, current_trace, trace_stage
+from app.utils.file_handler import ExtractionLimits, extract_text_with_links, read_upload_file
 from app.utils.validators import ParsingError, validate_file_type
 
 logger = get_logger(__name__)
 
 
-async def parse_resume(user_id: str, upload_file: UploadFile) -> ResumeSchema:
+@dataclass
+class ParseOutcome:
+    resume: ResumeSchema
+    parse_id: Optional[str] = None
+
+
+async def parse_resume(
+    user_id: str,
+    upload_file: UploadFile,
+    previous_parse_id: Optional[str] = None,
+) -> ParseOutcome:
+    async with capacity_monitor.track_parse(), capture_trace():
+        return await _parse_resume(user_id, upload_file, previous_parse_id)
+
+
+async def _parse_resume(user_id: str, upload_file: UploadFile, previous_parse_id: Optional[str]) -> ParseOutcome:
     settings = get_settings()
     allowed_types = settings.allowed_file_type_set()
     file_extension = validate_file_type(upload_file.filename or "", allowed_types)
@@ -23,21 +45,64 @@ async def parse_resume(user_id: str, upload_file: UploadFile) -> ResumeSchema:
         extra={"user_id": user_id, "original_filename": upload_file.filename, "file_type": file_extension},
     )
 
-    file_bytes = await read_upload_file(upload_file, settings.max_file_size_mb)
-    _file_hash = sha256_bytes(file_bytes)
+    try:
+        with trace_stage("read"):
+            upload = await read_upload_file(upload_file, settings.max_file_size_mb)
 
-    logger.info(
-        "resume.file_read",
-        extra={"user_id": user_id, "file_size": len(file_bytes), "file_hash": _file_hash},
-    )
+        logger.info(
+            "resume.file_read",
+            extra={"user_id": user_id, "file_size": upload.size, "file_hash": upload.sha256},
+        )
+
+        limits = ExtractionLimits(
+            max_pages=settings.pdf_max_pages,
+            max_chars=settings.pdf_max_chars,
+            max_cpu_seconds=settings.pdf_max_cpu_seconds,
+            max_page_content_bytes=settings.pdf_max_page_content_bytes,
+        )
+        with trace_stage("extract"):
+            document = await extract_text_with_links(upload.file, file_extension, limits)
+    finally:
+        await upload_file.close()
 
-    resume_text, hyperlinks = await extract_text_with_links(file_bytes, file_extension)
+    resume_text, hyperlinks = document.text, document.hyperlinks
     if not resume_text.strip():
         raise ParsingError("No text extracted from resume")
 
     logger.info(
         "resume.text_extracted",
-        extra={"user_id": user_id, "text_length": len(resume_text), "hyperlinks_count": len(hyperlinks)},
+        extra={
+            "user_id": user_id,
+            "text_length": len(resume_text),
+            "hyperlinks_count": len(hyperlinks),
+            "page_count": document.page_count,
+            "truncated": document.truncated,
+            "extraction_stats": document.stats,
+        },
     )
+    if document.truncated:
+        metrics.increment(f"extraction.truncated.{document.stats.get('truncated_by')}")
+    for reason, count in document.stats.get("pages_skipped", {}).items():
+        metrics.increment(f"extraction.pages_skipped.{reason}", count)
+
+    # Route on the pages the text was taken from: a truncated PDF reports its full page count.
+    page_count = document.stats.get("pages_extracted", document.page_count)
+
+    trace = current_trace()
+    if trace is not None:
+        trace.file = {"type": file_extension, "size_bytes": upload.size}
+        trace.incremental_parse_enabled = settings.incremental_parse_enabled
+        trace.document = {
+            **DocumentFeatures.from_text(resume_text, hyperlinks, page_count).as_dict(),
+            "truncated": document.truncated,
+            "extraction_stats": document.stats,
+        }
+
+    with trace_stage("parse"):
+        if settings.incremental_parse_enabled:
+            resume, parse_id = await parse_incrementally(
+                user_id, resume_text, hyperlinks, previous_parse_id, page_count
+            )
+            return ParseOutcome(resume=resume, parse_id=parse_id)
 
-    return await parse_resume_with_llm(resume_text, hyperlinks)
+        return ParseOutcome(resume=await parse_resume_with_llm(resume_text, hyperlinks, page_count))
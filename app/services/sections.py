@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Tuple
+
+from app.utils.hashing import sha256_bytes
+
+HEADER_SECTION = "header"
+
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about", "about me"),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"),
+    "skills": ("skills", "technical skills", "core competencies", "key skills", "technologies", "tech stack"),
+    "projects": ("projects", "personal projects", "selected projects", "academic projects"),
+    "additional": ("certifications", "certificates", "awards", "honors", "honours", "achievements",
+                   "publications", "languages", "interests", "hobbies", "volunteering", "activities",
+                   "additional information"),
+}
+
+# Which top-level ResumeSchema fields each section is responsible for. Fields
+# whose section is absent from a document fall back to the header section.
+SECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    HEADER_SECTION: ("personal_information",),
+    "summary": ("professional_summary",),
+    "education": ("education",),
+    "experience": ("work_experience",),
+    "skills": ("skills",),
+    "projects": ("projects",),
+    "additional": ("additional_information",),
+}
+
+_HEADING_LOOKUP = {alias: kind for kind, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_CLEANUP = re.compile(r"[^a-z& ]+")
+
+
+def _heading_kind(line: str) -> str | None:
+    candidate = _HEADING_CLEANUP.sub("", line.strip().lower()).replace("&", "and")
+    candidate = " ".join(candidate.split())
+    if not candidate or len(candidate.split()) > 4:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+
+def is_heading(line: str) -> bool:
+    return _heading_kind(line) is not None
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split resume text into sections keyed by section kind.
+
+    Text before the first recognised heading belongs to the header section,
+    which is always present (possibly empty). Repeated headings of the same
+    kind (e.g. "Awards" and "Languages") are concatenated in document order.
+    """
+    sections: Dict[str, List[str]] = {HEADER_SECTION: []}
+    current = HEADER_SECTION
+    for line in text.splitlines():
+        kind = _heading_kind(line)
+        if kind is not None:
+            current = kind
+            sections.setdefault(current, [])
+        sections[current].append(line)
+    return {
+        kind: "\n".join(lines).strip()
+        for kind, lines in sections.items()
+        # A section is empty when nothing but its heading line was found.
+        if kind == HEADER_SECTION or "".join(lines[1:]).strip()
+    }
+
+
+def field_owners(section_kinds: List[str]) -> Dict[str, str]:
+    owners: Dict[str, str] = {}
+    for kind, fields in SECTION_FIELDS.items():
+        for field in fields:
+            owners[field] = kind if kind in section_kinds else HEADER_SECTION
+    return owners
+
+
+def section_hash(text: str) -> str:
+    normalized = "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+    return sha256_bytes(normalized.encode("utf-8"))
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import anyio
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.services.sections import is_heading
+from app.utils.hashing import sha256_bytes
+
+logger = get_logger(__name__)
+
+_current_trace: ContextVar[Optional["ParseTrace"]] = ContextVar("current_trace", default=None)
+_write_lock = threading.Lock()
+_LETTER = re.compile(r"[^\W\d_]")
+_DIGIT = re.compile(r"\d")
+
+
+def anonymize_text(text: str) -> str:
+    """Mask letters and digits, keeping length, layout, punctuation and section headings.
+
+    Masking is idempotent and keeps everything request routing looks at
+    (size, line structure, headings), so a replayed request takes the same
+    route as the captured one.
+    """
+    return "\n".join(line if is_heading(line) else _DIGIT.sub("0", _LETTER.sub("x", line)) for line in text.split("\n"))
+
+
+def anonymize_links(hyperlinks: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    return [{key: anonymize_text(value) for key, value in link.items()} for link in hyperlinks or []]
+
+
+def _anonymize_values(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {key: _anonymize_values(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_anonymize_values(item) for item in data]
+    if isinstance(data, str):
+        return anonymize_text(data)
+    return data
+
+
+def anonymize_completion(text: str) -> str:
+    """Mask the values of a JSON completion, keeping its keys so it still parses the same way."""
+    start, end = text.find("{"), text.rfind("}")
+    try:
+        data = json.loads(text[start : end + 1])
+    except ValueError:
+        return anonymize_text(text)
+    return text[:start] + json.dumps(_anonymize_values(data), ensure_ascii=False) + text[end + 1 :]
+
+
+def prompt_hash(messages: List[Any]) -> str:
+    return sha256_bytes("\n".join(f"{message.type}:{message.content}" for message in messages).encode("utf-8"))
+
+
+class ParseTrace:
+    """Anonymized record of one parse: document features, stage timings and LLM calls.
+
+    Completions are stored once per prompt hash, where the prompt is the one
+    built from the anonymized input, so a replay can look them up by hashing
+    the messages it is about to send.
+    """
+
+    def __init__(self) -> None:
+        self.trace_id = uuid.uuid4().hex
+        self.captured_at = datetime.now(timezone.utc).isoformat()
+        self.file: Dict[str, Any] = {}
+        self.document: Dict[str, Any] = {}
+        self.incremental_parse_enabled: Optional[bool] = None
+        self.stages_ms: Dict[str, float] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.completions: Dict[str, str] = {}
+        self.error: Optional[str] = None
+
+    def add_stage(self, name: str, duration_ms: float) -> None:
+        self.stages_ms[name] = round(self.stages_ms.get(name, 0.0) + duration_ms, 2)
+
+    def record_llm_call(self, call: Dict[str, Any], completion: str) -> None:
+        self.llm_calls.append(call)
+        self.completions[call["prompt_hash"]] = anonymize_completion(completion)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "captured_at": self.captured_at,
+            "file": self.file,
+            "document": self.document,
+            "incremental_parse_enabled": self.incremental_parse_enabled,
+            "stages_ms": self.stages_ms,
+            "llm_calls": self.llm_calls,
+            "completions": self.completions,
+            "error": self.error,
+        }
+
+
+def current_trace() -> Optional[ParseTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_stage(name: str) -> Iterator[None]:
+    """Add the duration of the block to stage ``name`` of the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, (time.perf_counter() - start_time) * 1000)
+
+
+def _append(path: Path, line: str, max_files: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock:
+        new_file = not path.exists()
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+        if new_file:
+            # Daily file names sort by date; keep the newest ``max_files``.
+            for old_path in sorted(path.parent.glob("traces-*.jsonl"))[:-max_files]:
+                old_path.unlink(missing_ok=True)
+
+
+@asynccontextmanager
+async def capture_trace(force: bool = False) -> AsyncIterator[Optional[ParseTrace]]:
+    """Capture a trace of the enclosed parse when trace capture is enabled and sampled.
+
+    Traces are appended to one JSON Lines file per UTC day in
+    ``TRACE_CAPTURE_DIR``; older files beyond ``TRACE_CAPTURE_MAX_FILES`` are
+    deleted when a new day starts (0 keeps every file). A failure to write a
+    trace is logged and never fails the request. ``force`` collects a trace
+    without sampling or writing it, for the replay tool.
+    """
+    settings = get_settings()
+    if not force and (
+        not settings.trace_capture_enabled or random.random() >= settings.trace_capture_sample_rate
+    ):
+        yield None
+        return
+
+    trace = ParseTrace()
+    token = _current_trace.set(trace)
+    start_time = time.perf_counter()
+    try:
+        yield trace
+    except Exception as exc:
+        trace.error = type(exc).__name__
+        raise
+    finally:
+        _current_trace.reset(token)
+        trace.add_stage("total", (time.perf_counter() - start_time) * 1000)
+        if not force:
+            path = Path(settings.trace_capture_dir) / f"traces-{trace.captured_at[:10]}.jsonl"
+            try:
+                await anyio.to_thread.run_sync(
+                    _append, path, json.dumps(trace.as_dict(), ensure_ascii=False), settings.trace_capture_max_files
+                )
+            except OSError as exc:
+                logger.error("trace.write_failed", extra={"error": str(exc), "path": str(path)})
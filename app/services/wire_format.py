@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Type, get_args, get_origin
+
+from pydantic import BaseModel
+
+from app.schemas.resume_schema import ResumeSchema
+
+# Output formats the model can be asked to emit:
+# - "full": every key, with null and [] for missing values
+# - "compact": null, empty and [] values omitted
+# - "aliased": compact, with the short keys below
+WIRE_FORMATS = ("full", "compact", "aliased")
+
+KEY_ALIASES: Dict[str, str] = {
+    "personal_information": "pi",
+    "full_name": "n",
+    "email": "em",
+    "phone": "ph",
+    "location": "loc",
+    "linkedin": "li",
+    "github": "gh",
+    "website": "web",
+    "professional_summary": "sum",
+    "education": "edu",
+    "institution": "inst",
+    "degree": "deg",
+    "field_of_study": "fos",
+    "start_date": "sd",
+    "end_date": "ed",
+    "gpa": "gpa",
+    "work_experience": "exp",
+    "company": "co",
+    "title": "t",
+    "responsibilities": "resp",
+    "technologies": "tech",
+    "skills": "sk",
+    "languages": "lang",
+    "frameworks": "fw",
+    "tools": "tl",
+    "databases": "db",
+    "certifications": "cert",
+    "projects": "proj",
+    "name": "nm",
+    "description": "desc",
+    "link": "url",
+    "additional_information": "add",
+    "awards": "aw",
+    "publications": "pub",
+    "interests": "int",
+}
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    if get_origin(annotation) is list:
+        (annotation,) = get_args(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _check_aliases(model: Type[BaseModel]) -> None:
+    fields = list(model.model_fields)
+    missing = [name for name in fields if name not in KEY_ALIASES]
+    if missing:
+        raise ValueError(f"No wire alias for {model.__name__} fields: {missing}")
+    aliases = [KEY_ALIASES[name] for name in fields]
+    clashes = [name for name in fields if KEY_ALIASES[name] in fields and KEY_ALIASES[name] != name]
+    if len(set(aliases)) != len(aliases) or clashes:
+        raise ValueError(f"Ambiguous wire aliases for {model.__name__}")
+    for field in model.model_fields.values():
+        nested = _nested_model(field.annotation)
+        if nested is not None:
+            _check_aliases(nested)
+
+
+_check_aliases(ResumeSchema)
+
+
+def schema_skeleton(model: Type[BaseModel] = ResumeSchema, aliases: bool = False, typed: bool = False) -> Dict[str, Any]:
+    """Describe ``model`` as a JSON skeleton: null scalars, [] string lists, one example object per object list.
+
+    With ``typed`` scalars are shown as ``"str"`` and string lists as
+    ``["str"]``, for formats where null and empty values must be omitted.
+    """
+    skeleton: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        key = KEY_ALIASES[name] if aliases else name
+        nested = _nested_model(field.annotation)
+        if get_origin(field.annotation) is list:
+            if nested is not None:
+                skeleton[key] = [schema_skeleton(nested, aliases, typed)]
+            else:
+                skeleton[key] = ["str"] if typed else []
+        elif nested is not None:
+            skeleton[key] = schema_skeleton(nested, aliases, typed)
+        else:
+            skeleton[key] = "str" if typed else None
+    return skeleton
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def encode(data: Any, model: Type[BaseModel] = ResumeSchema, aliases: bool = False) -> Any:
+    """Encode a full payload in the compact wire format (the inverse of ``expand``)."""
+    if isinstance(data, list):
+        return [encode(item, model, aliases) for item in data]
+    if not isinstance(data, dict):
+        return data
+    encoded: Dict[str, Any] = {}
+    for key, value in data.items():
+        field = model.model_fields.get(key)
+        nested = _nested_model(field.annotation) if field is not None else None
+        if nested is not None:
+            value = encode(value, nested, aliases)
+            if isinstance(value, list):
+                value = [item for item in value if not _is_empty(item)]
+        if _is_empty(value):
+            continue
+        encoded[KEY_ALIASES[key] if aliases and field is not None else key] = value
+    return encoded
+
+
+def expand(data: Any, model: Type[BaseModel] = ResumeSchema) -> Any:
+    """Rename aliased keys back to ``model``'s field names, recursively.
+
+    Keys that are already full field names, and unknown keys, are kept as-is so
+    that a model mixing both forms still expands. Omitted fields are filled in
+    later from the schema defaults.
+    """
+    if isinstance(data, list):
+        return [expand(item, model) for item in data]
+    if not isinstance(data, dict):
+        return data
+    fields_by_key = {KEY_ALIASES[name]: name for name in model.model_fields}
+    fields_by_key.update({name: name for name in model.model_fields})
+    expanded: Dict[str, Any] = {}
+    for key, value in data.items():
+        name = fields_by_key.get(key, key)
+        field = model.model_fields.get(name)
+        nested = _nested_model(field.annotation) if field is not None else None
+        expanded[name] = expand(value, nested) if nested is not None else value
+    return expanded
@@ -1,67 +1,119 @@
 from __future__ import annotations
 
-import io
+import os
 import re
-from typing import Dict, List, Tuple
+import time
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 
 import anyio
-import pdfplumber
-from docx import Document
-from docx.oxml import CT_Hyperlink
-from docx.oxml.text.paragraph import CT_P
-from docx.text.paragraph import Paragraph
 from fastapi import UploadFile
 
+from app.utils.hashing import sha256_file
 from app.utils.validators import FileTooLargeError, ParsingError
 
 
-async def read_upload_file(upload_file: UploadFile, max_size_mb: int) -> bytes:
+class UploadedFile:
+    """A validated upload, still backed by the request's spooled temp file."""
+
+    def __init__(self, file: BinaryIO, size: int, sha256: str) -> None:
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+
+
+class ExtractionLimits:
+    """Caps that bound PDF extraction time regardless of the input document.
+
+    ``max_page_content_bytes`` limits the raw content-stream size of a page,
+    a cheap proxy for its object count that is known before layout analysis.
+    """
+
+    def __init__(
+        self,
+        max_pages: int,
+        max_chars: int,
+        max_cpu_seconds: float,
+        max_page_content_bytes: int,
+    ) -> None:
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.max_cpu_seconds = max_cpu_seconds
+        self.max_page_content_bytes = max_page_content_bytes
+
+
+class ExtractedDocument:
+    def __init__(
+        self,
+        text: str,
+        hyperlinks: List[Dict[str, str]],
+        page_count: Optional[int],
+        truncated: bool = False,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.text = text
+        self.hyperlinks = hyperlinks
+        self.page_count = page_count
+        self.truncated = truncated
+        self.stats = stats or {}
+
+
+def _inspect_upload(file: BinaryIO, max_bytes: int) -> Tuple[int, str]:
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    if size > max_bytes:
+        raise FileTooLargeError("File exceeds maximum size")
+    file.seek(0)
+    file_hash = sha256_file(file)
+    file.seek(0)
+    return size, file_hash
+
+
+async def read_upload_file(upload_file: UploadFile, max_size_mb: int) -> UploadedFile:
+    """Validate the size of an upload and hash it without copying it into memory.
+
+    Starlette has already spooled the multipart body into ``upload_file.file``;
+    the extractors read from that file object directly, so the caller must
+    close ``upload_file`` once extraction has finished.
+    """
     max_bytes = max_size_mb * 1024 * 1024
-    buffer = bytearray()
-    while True:
-        chunk = await upload_file.read(1024 * 1024)
-        if not chunk:
-            break
-        buffer.extend(chunk)
-        if len(buffer) > max_bytes:
-            raise FileTooLargeError("File exceeds maximum size")
-    await upload_file.close()
-    return bytes(buffer)
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise FileTooLargeError("File exceeds maximum size")
+    size, file_hash = await anyio.to_thread.run_sync(_inspect_upload, upload_file.file, max_bytes)
+    return UploadedFile(upload_file.file, size, file_hash)
 
 
-def _extract_pdf_hyperlinks(file_bytes: bytes) -> List[Dict[str, str]]:
-    """Extract hyperlinks from PDF file."""
+def _extract_pdf_page_hyperlinks(page: Any) -> List[Dict[str, str]]:
+    """Extract hyperlinks from one page of an open PDF."""
     hyperlinks = []
     
     try:
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                # Extract annotations (clickable links)
-                if hasattr(page, 'annots') and page.annots:
-                    for annot in page.annots:
-                        if annot and isinstance(annot, dict):
-                            # Get the URI from the annotation
-                            uri = annot.get('uri') or annot.get('A', {}).get('URI')
-                            # Get the display text from the rectangle area
-                            text = annot.get('contents') or ""
-                            
-                            if uri:
-                                hyperlinks.append({
-                                    'text': text.strip(),
-                                    'url': uri.strip()
-                                })
-                
-                # Also check for hyperlinks in page objects
-                if hasattr(page, 'hyperlinks'):
-                    for link in page.hyperlinks:
-                        if isinstance(link, dict):
-                            url = link.get('uri') or link.get('url')
-                            text = link.get('text', '')
-                            if url:
-                                hyperlinks.append({
-                                    'text': text.strip(),
-                                    'url': url.strip()
-                                })
+        # Extract annotations (clickable links)
+        if hasattr(page, 'annots') and page.annots:
+            for annot in page.annots:
+                if annot and isinstance(annot, dict):
+                    # Get the URI from the annotation
+                    uri = annot.get('uri') or annot.get('A', {}).get('URI')
+                    # Get the display text from the rectangle area
+                    text = annot.get('contents') or ""
+                    
+                    if uri:
+                        hyperlinks.append({
+                            'text': text.strip(),
+                            'url': uri.strip()
+                        })
+        
+        # Also check for hyperlinks in page objects
+        if hasattr(page, 'hyperlinks'):
+            for link in page.hyperlinks:
+                if isinstance(link, dict):
+                    url = link.get('uri') or link.get('url')
+                    text = link.get('text', '')
+                    if url:
+                        hyperlinks.append({
+                            'text': text.strip(),
+                            'url': url.strip()
+                        })
     except Exception:
         # If hyperlink extraction fails, return empty list
         pass
@@ -69,13 +121,13 @@ def _extract_pdf_hyperlinks(file_bytes: bytes) -> List[Dict[str, str]]:
     return hyperlinks
 
 
-def _extract_docx_hyperlinks(file_bytes: bytes) -> List[Dict[str, str]]:
-    """Extract hyperlinks from DOCX file."""
+def _extract_docx_hyperlinks(document: Any) -> List[Dict[str, str]]:
+    """Extract hyperlinks from an open DOCX document."""
+    from docx.oxml import CT_Hyperlink
+
     hyperlinks = []
     
     try:
-        document = Document(io.BytesIO(file_bytes))
-        
         # Iterate through all paragraphs
         for paragraph in document.paragraphs:
             # Get hyperlinks from paragraph XML
@@ -122,44 +174,189 @@ def _extract_docx_hyperlinks(file_bytes: bytes) -> List[Dict[str, str]]:
     return hyperlinks
 
 
-def _extract_pdf_text(file_bytes: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        pages_text = [page.extract_text() or "" for page in pdf.pages]
-    return "\n".join(pages_text).strip()
+def _pdf_page_count(pdf: Any) -> Optional[int]:
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        count = resolve1(resolve1(pdf.doc.catalog["Pages"]).get("Count"))
+    except Exception:
+        return None
+    return count if isinstance(count, int) else None
+
+
+def _decoded_stream_size(stream: Any, cap: int) -> int:
+    """Size of a PDF stream once decoded, decompressing at most ``cap + 1`` bytes.
+
+    A small Flate stream can expand to an arbitrarily large drawing, so its
+    compressed ``/Length`` says little about the layout work it causes.
+    Other filters are rare in content streams and are decoded by pdfminer.
+    """
+    import zlib
+
+    from pdfminer.pdftypes import LITERALS_FLATE_DECODE
+
+    rawdata = stream.get_rawdata()
+    if rawdata is None:
+        return len(stream.get_data())
+    if stream.decipher:
+        rawdata = stream.decipher(stream.objid, stream.genno, rawdata, stream.attrs)
+    filters = [name for name, _ in stream.get_filters()]
+    if not filters:
+        return len(rawdata)
+    if len(filters) == 1 and filters[0] in LITERALS_FLATE_DECODE:
+        try:
+            return len(zlib.decompressobj().decompress(rawdata, cap + 1))
+        except zlib.error:
+            return 0
+    return len(stream.get_data())
+
 
+def _pdf_page_content_size(page_obj: Any, cap: int) -> int:
+    """Decoded size of a page's content streams and the form XObjects it draws, up to ``cap + 1``."""
+    from pdfminer.pdftypes import PDFStream, resolve1
 
-def _extract_docx_text(file_bytes: bytes) -> str:
-    document = Document(io.BytesIO(file_bytes))
+    contents = page_obj.contents if isinstance(page_obj.contents, list) else [page_obj.contents]
+    resources = resolve1(page_obj.resources) or {}
+    xobjects = resolve1(resources.get("XObject")) or {}
+    forms = [
+        xobject
+        for xobject in (resolve1(value) for value in xobjects.values())
+        if isinstance(xobject, PDFStream) and getattr(xobject.get("Subtype"), "name", None) == "Form"
+    ]
+    size = 0
+    for stream in [resolve1(stream) for stream in contents] + forms:
+        if isinstance(stream, PDFStream):
+            size += _decoded_stream_size(stream, cap - size)
+        if size > cap:
+            break
+    return size
+
+
+def _pdf_page_skip_reason(page: Any, limits: ExtractionLimits) -> Optional[str]:
+    """Decide from the page dictionary alone whether a page is worth laying out."""
+    from pdfminer.pdftypes import resolve1
+
+    page_obj = page.page_obj
+    if _pdf_page_content_size(page_obj, limits.max_page_content_bytes) > limits.max_page_content_bytes:
+        return "oversized"
+
+    resources = resolve1(page_obj.resources) or {}
+    xobjects = resolve1(resources.get("XObject")) or {}
+    subtypes = {getattr(resolve1(xobject).get("Subtype"), "name", None) for xobject in xobjects.values()}
+    if not resolve1(resources.get("Font")) and subtypes == {"Image"}:
+        return "image_only"
+    return None
+
+
+def _extract_pdf_pages(pdf: Any, limits: ExtractionLimits) -> ExtractedDocument:
+    """Extract page by page until a page, character or CPU-time cap is reached."""
+    start_cpu = time.thread_time()
+    total_pages = _pdf_page_count(pdf)
+    pages_text: List[str] = []
+    hyperlinks: List[Dict[str, str]] = []
+    chars = 0
+    stats: Dict[str, Any] = {"pages_total": total_pages, "pages_extracted": 0, "pages_skipped": {}}
+    truncated_by: Optional[str] = None
+
+    for page in pdf.pages:
+        if chars >= limits.max_chars:
+            truncated_by = "chars"
+            break
+        if time.thread_time() - start_cpu > limits.max_cpu_seconds:
+            truncated_by = "cpu_time"
+            break
+        try:
+            skip_reason = _pdf_page_skip_reason(page, limits)
+        except Exception:
+            # A malformed page dictionary is left to the layout pass to handle.
+            skip_reason = None
+        if skip_reason:
+            stats["pages_skipped"][skip_reason] = stats["pages_skipped"].get(skip_reason, 0) + 1
+            continue
+
+        page_text = page.extract_text() or ""
+        hyperlinks.extend(_extract_pdf_page_hyperlinks(page))
+        page.close()
+        stats["pages_extracted"] += 1
+
+        remaining = limits.max_chars - chars
+        if len(page_text) > remaining:
+            pages_text.append(page_text[:remaining])
+            truncated_by = "chars"
+            break
+        pages_text.append(page_text)
+        chars += len(page_text) + 1
+
+    if truncated_by is None and total_pages is not None and total_pages > limits.max_pages:
+        truncated_by = "pages"
+    stats["truncated_by"] = truncated_by
+    stats["cpu_ms"] = round((time.thread_time() - start_cpu) * 1000, 2)
+    return ExtractedDocument(
+        "\n".join(pages_text).strip(),
+        hyperlinks,
+        total_pages,
+        truncated=truncated_by is not None,
+        stats=stats,
+    )
+
+
+def _extract_docx_text(document: Any) -> str:
     paragraphs = [paragraph.text for paragraph in document.paragraphs]
     return "\n".join(paragraphs).strip()
 
 
-def _extract_pdf_with_links(file_bytes: bytes) -> Tuple[str, List[Dict[str, str]]]:
-    """Extract both text and hyperlinks from PDF."""
-    text = _extract_pdf_text(file_bytes)
-    hyperlinks = _extract_pdf_hyperlinks(file_bytes)
-    return text, hyperlinks
+def _docx_page_count(file: BinaryIO) -> Optional[int]:
+    """Read the page count Word stores in docProps/app.xml, if present."""
+    try:
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive:
+            app_properties = archive.read("docProps/app.xml").decode("utf-8", "ignore")
+    except (KeyError, zipfile.BadZipFile):
+        return None
+    match = re.search(r"<Pages>(\d+)</Pages>", app_properties)
+    return int(match.group(1)) if match else None
 
 
-def _extract_docx_with_links(file_bytes: bytes) -> Tuple[str, List[Dict[str, str]]]:
-    """Extract both text and hyperlinks from DOCX."""
-    text = _extract_docx_text(file_bytes)
-    hyperlinks = _extract_docx_hyperlinks(file_bytes)
-    return text, hyperlinks
+def _extract_pdf_with_links(file: BinaryIO, limits: ExtractionLimits) -> ExtractedDocument:
+    """Extract both text and hyperlinks from PDF in a single open, within ``limits``."""
+    import pdfplumber
 
+    file.seek(0)
+    # Only the first max_pages pages are turned into pdfplumber pages at all.
+    with pdfplumber.open(file, pages=range(1, limits.max_pages + 1)) as pdf:
+        return _extract_pdf_pages(pdf, limits)
+
+
+def _extract_docx_with_links(file: BinaryIO) -> ExtractedDocument:
+    """Extract both text and hyperlinks from DOCX in a single load."""
+    from docx import Document
+
+    file.seek(0)
+    document = Document(file)
+    text = _extract_docx_text(document)
+    hyperlinks = _extract_docx_hyperlinks(document)
+    return ExtractedDocument(text, hyperlinks, _docx_page_count(file), stats={"tables": len(document.tables)})
+
+
+async def extract_text(file: BinaryIO, file_extension: str, limits: ExtractionLimits) -> str:
+    document = await extract_text_with_links(file, file_extension, limits)
+    return document.text
 
-async def extract_text(file_bytes: bytes, file_extension: str) -> str:
-    if file_extension == "pdf":
-        return await anyio.to_thread.run_sync(_extract_pdf_text, file_bytes)
-    if file_extension == "docx":
-        return await anyio.to_thread.run_sync(_extract_docx_text, file_bytes)
-    raise ParsingError("Unsupported file type for extraction")
 
+async def extract_text_with_links(
+    file: BinaryIO,
+    file_extension: str,
+    limits: ExtractionLimits,
+) -> ExtractedDocument:
+    """Extract text, hyperlinks and the page count from the file.
 
-async def extract_text_with_links(file_bytes: bytes, file_extension: str) -> Tuple[str, List[Dict[str, str]]]:
-    """Extract both text and hyperlinks from the file."""
+    ``file`` is read in a worker thread straight from its current backing
+    (memory or disk), so it must not be used concurrently until this returns.
+    PDF extraction stops early once ``limits`` are reached and reports it via
+    ``ExtractedDocument.truncated`` and ``stats``.
+    """
     if file_extension == "pdf":
-        return await anyio.to_thread.run_sync(_extract_pdf_with_links, file_bytes)
+        return await anyio.to_thread.run_sync(_extract_pdf_with_links, file, limits)
     if file_extension == "docx":
-        return await anyio.to_thread.run_sync(_extract_docx_with_links, file_bytes)
+        return await anyio.to_thread.run_sync(_extract_docx_with_links, file)
     raise ParsingError("Unsupported file type for extraction")
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import hashlib
+from typing import BinaryIO
 
 
 def sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(file: BinaryIO) -> str:
+    """Hash a binary file from its current position in fixed-size chunks."""
+    return hashlib.file_digest(file, "sha256").hexdigest()
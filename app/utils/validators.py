@@ -19,6 +19,14 @@ class ParsingError(Exception):
     pass
 
 
+class ServiceUnavailableError(Exception):
+    pass
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
 def validate_file_type(filename: str, allowed_types: Set[str]) -> str:
     if not filename or "." not in filename:
         raise InvalidFileTypeError("File type is missing")
@@ -0,0 +1,83 @@
+"""Cold-start benchmark for the service.
+
+Measures how long ``import app.main`` takes (what uvicorn pays before it can
+accept connections) and how long the background warm-up adds on top, and
+prints the slowest modules from ``python -X importtime``.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--top 15]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_APP = "import time; s = time.perf_counter(); import app.main; print(time.perf_counter() - s)"
+IMPORT_WARM = (
+    "import time, importlib; s = time.perf_counter(); import app.main; "
+    "from app.core.warmup import HEAVY_MODULES; "
+    "[importlib.import_module(m) for m in HEAVY_MODULES]; print(time.perf_counter() - s)"
+)
+
+
+def _run(code: str, importtime: bool = False) -> Tuple[float, str]:
+    args = [sys.executable]
+    if importtime:
+        args += ["-X", "importtime"]
+    args += ["-c", code]
+    result = subprocess.run(args, cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    rows: List[Tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _top_level_breakdown(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    breakdown: Dict[str, int] = {}
+    for name, self_us, _ in rows:
+        package = name.split(".", 1)[0]
+        breakdown[package] = breakdown.get(package, 0) + self_us
+    return breakdown
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    app_times = [_run(IMPORT_APP)[0] for _ in range(args.runs)]
+    warm_times = [_run(IMPORT_WARM)[0] for _ in range(args.runs)]
+
+    print(f"import app.main            median {statistics.median(app_times) * 1000:8.1f} ms  (n={args.runs})")
+    print(f"import app.main + warm-up  median {statistics.median(warm_times) * 1000:8.1f} ms  (n={args.runs})")
+
+    _, stderr = _run(IMPORT_APP, importtime=True)
+    rows = _parse_importtime(stderr)
+
+    print(f"\nSlowest modules on the app.main import path (cumulative, top {args.top}):")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[: args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    print("\nSelf time by top-level package:")
+    breakdown = _top_level_breakdown(rows)
+    for package, self_us in sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Peak-memory benchmark for the upload-to-extractor path.
+
+Runs ``read_upload_file`` and ``extract_text_with_links`` concurrently on
+uploads backed by Starlette-style ``SpooledTemporaryFile``s, the way a
+multipart request arrives, and reports the peak traced Python allocation and
+the process peak RSS.
+
+Usage:
+    python scripts/bench_upload_memory.py [--file resume.pdf] [--size-mb 5] [--concurrency 8]
+
+Without ``--file`` a synthetic text PDF padded to ``--size-mb`` is generated.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from starlette.datastructures import UploadFile  # noqa: E402
+
+from app.utils.file_handler import ExtractionLimits, extract_text_with_links, read_upload_file  # noqa: E402
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's multipart spool threshold
+LIMITS = ExtractionLimits(max_pages=20, max_chars=60000, max_cpu_seconds=5.0, max_page_content_bytes=2 * 1024 * 1024)
+
+
+def serialize_pdf(objects: List[bytes]) -> bytes:
+    """Serialize numbered objects (object 1 is the catalog) with a cross-reference table."""
+    body = [b"%PDF-1.4\n"]
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(sum(len(part) for part in body))
+        body.append(b"%d 0 obj\n%s\nendobj\n" % (number, obj))
+    xref_offset = sum(len(part) for part in body)
+    body.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    body.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    body.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return b"".join(body)
+
+
+def build_pdf(pages: int, size_mb: float = 0.0) -> bytes:
+    """Build a minimal text PDF with one link annotation per page.
+
+    The file is padded with an unreferenced binary stream up to ``size_mb`` so
+    the upload size can be controlled independently of the text volume.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for index in range(pages):
+        lines = [f"Page {index + 1} Senior Software Engineer at Example Corp 2019 - 2024"] + [
+            f"Built and operated service number {line} handling resume parsing workloads" for line in range(30)
+        ]
+        content = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        content_id = len(objects) + 1
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content.encode("latin-1")))
+        annot_id = len(objects) + 1
+        objects.append(
+            b"<< /Type /Annot /Subtype /Link /Rect [50 770 300 790] "
+            b"/A << /S /URI /URI (https://github.com/example-%d) >> >>" % index
+        )
+        kids.append(len(objects) + 1)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Annots [%d 0 R] >>" % (content_id, annot_id)
+        )
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        len(kids),
+    )
+
+    document = serialize_pdf(objects)
+    padding = int(size_mb * 1024 * 1024) - len(document) - 64
+    if padding > 0:
+        noise = bytes(range(256)) * (padding // 256 + 1)
+        document = serialize_pdf(objects + [b"<< /Length %d >>\nstream\n%s\nendstream" % (padding, noise[:padding])])
+    return document
+
+
+def _make_upload(payload: bytes, filename: str) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename=filename, size=len(payload))
+
+
+async def _process(payload: bytes, filename: str, extension: str, max_size_mb: int) -> int:
+    upload_file = _make_upload(payload, filename)
+    try:
+        upload = await read_upload_file(upload_file, max_size_mb)
+        document = await extract_text_with_links(upload.file, extension, LIMITS)
+    finally:
+        await upload_file.close()
+    return len(document.text)
+
+
+async def _run(payload: bytes, filename: str, concurrency: int, rounds: int) -> float:
+    extension = filename.rsplit(".", 1)[-1].lower()
+    max_size_mb = len(payload) // (1024 * 1024) + 1
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(_process(payload, filename, extension, max_size_mb) for _ in range(concurrency)))
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", type=Path)
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        payload, filename = args.file.read_bytes(), args.file.name
+    else:
+        payload, filename = build_pdf(args.pages, args.size_mb), "synthetic.pdf"
+
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    elapsed = asyncio.run(_run(payload, filename, args.concurrency, args.rounds))
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"upload size            {len(payload) / 1024 / 1024:8.2f} MB ({filename})")
+    print(f"concurrency x rounds   {args.concurrency} x {args.rounds}")
+    print(f"elapsed                {elapsed:8.2f} s")
+    print(f"peak traced alloc      {traced_peak / 1024 / 1024:8.2f} MB")
+    print(f"peak RSS               {peak_rss_kb / 1024:8.2f} MB (+{(peak_rss_kb - baseline_rss_kb) / 1024:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
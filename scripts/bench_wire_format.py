@@ -0,0 +1,125 @@
+"""Compare LLM output size and latency across the output wire formats.
+
+Offline, every recorded parse in ``--fixtures`` (``*.json`` files holding a
+ResumeSchema payload) is encoded in each wire format. The script reports the
+estimated output tokens per resume and checks that the local expander turns
+each encoding back into the identical ResumeSchema.
+
+With ``--live`` (requires GROQ_API_KEY) each ``*.txt`` resume text in
+``--fixtures`` is parsed once per format. The script reports output tokens
+from the provider's usage data, median latency, and the share of resumes whose
+result matches the "full" format exactly.
+
+Usage:
+    python scripts/bench_wire_format.py --fixtures path/to/fixtures [--live]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.schemas.resume_schema import ResumeSchema  # noqa: E402
+from app.services.wire_format import WIRE_FORMATS, encode, expand  # noqa: E402
+from app.utils.tokens import estimate_tokens  # noqa: E402
+
+
+def _wire_text(payload: Dict[str, Any], wire_format: str) -> str:
+    if wire_format == "full":
+        return json.dumps(payload, separators=(",", ":"))
+    return json.dumps(encode(payload, aliases=wire_format == "aliased"), separators=(",", ":"))
+
+
+def _offline(parses: List[Dict[str, Any]]) -> None:
+    totals = {wire_format: 0 for wire_format in WIRE_FORMATS}
+    for payload in parses:
+        expected = ResumeSchema.model_validate(payload)
+        full = expected.model_dump()
+        for wire_format in WIRE_FORMATS:
+            text = _wire_text(full, wire_format)
+            totals[wire_format] += estimate_tokens(text)
+            decoded = json.loads(text)
+            if wire_format == "aliased":
+                decoded = expand(decoded)
+            if ResumeSchema.model_validate(decoded) != expected:
+                raise SystemExit(f"{wire_format} does not round-trip")
+    print(f"{len(parses)} recorded parses, all formats round-trip to identical ResumeSchema")
+    for wire_format, total in totals.items():
+        saved = 1 - total / totals["full"]
+        print(f"{wire_format:<8} ~{total / len(parses):7.0f} output tokens per resume (estimated)  {saved:4.0%} fewer")
+
+
+class _UsageRecorder:
+    """Wraps a chat model and records the output tokens of each completion."""
+
+    def __init__(self, llm: Any, output_tokens: List[int]) -> None:
+        self.llm = llm
+        self.output_tokens = output_tokens
+
+    async def ainvoke(self, messages: Any) -> Any:
+        response = await self.llm.ainvoke(messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        self.output_tokens.append(usage.get("output_tokens", 0))
+        return response
+
+
+async def _live(texts: List[str]) -> None:
+    import app.services.llm_service as llm_service
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    results: Dict[str, List[ResumeSchema]] = {}
+    for wire_format in WIRE_FORMATS:
+        settings.llm_output_format = wire_format
+        latencies: List[float] = []
+        output_tokens: List[int] = []
+        results[wire_format] = []
+        original_build_llm = llm_service._build_llm
+        llm_service._build_llm = lambda model, max_tokens=None: _UsageRecorder(
+            original_build_llm(model, max_tokens), output_tokens
+        )
+        try:
+            for text in texts:
+                start_time = time.perf_counter()
+                results[wire_format].append(await llm_service.parse_resume_with_llm(text))
+                latencies.append(time.perf_counter() - start_time)
+        finally:
+            llm_service._build_llm = original_build_llm
+
+        print(
+            f"{wire_format:<8} mean output tokens {statistics.mean(output_tokens):7.0f}  "
+            f"median latency {statistics.median(latencies) * 1000:8.1f} ms"
+        )
+
+    for wire_format in WIRE_FORMATS[1:]:
+        agreement = sum(a == b for a, b in zip(results["full"], results[wire_format])) / len(texts)
+        print(f"{wire_format:<8} identical to full on {agreement:.0%} of resumes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, required=True)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    parses = [json.loads(path.read_text()) for path in sorted(args.fixtures.glob("*.json"))]
+    if parses:
+        _offline(parses)
+    if args.live:
+        if "GROQ_API_KEY" not in os.environ:
+            raise SystemExit("--live requires GROQ_API_KEY")
+        texts = [path.read_text() for path in sorted(args.fixtures.glob("*.txt"))]
+        asyncio.run(_live(texts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Replay captured production traces against the current code.
+
+Reads the JSON Lines traces written with ``TRACE_CAPTURE_ENABLED=true`` and
+re-drives every recorded LLM call through ``parse_resume_with_llm``: routing,
+prompt building, the request policy, and parsing, expansion and validation of
+the completion. The chat model is replaced by a stub that answers with the
+recorded completion for the prompt's hash, after the recorded latency (or
+immediately with ``--llm-latency none``). Hedging is disabled because a stub
+with fixed latency never benefits from it.
+
+The report compares recorded and replayed p50/p95 for the stages the replay
+runs: ``llm_parse`` (one ``parse_resume_with_llm`` call end to end), ``llm``
+and ``postprocess``. Upload reading, extraction and the ``parse`` stage are
+not replayed, since traces do not contain the uploaded files and ``parse``
+also covers the incremental parse store when ``incremental_parse_enabled`` is
+recorded as true; their recorded timings are shown for reference. A prompt whose hash is
+not in the trace (for example after a prompt change) fails the call unless
+``--allow-prompt-drift`` is given, in which case the recorded completion is
+used anyway.
+
+Usage:
+    python scripts/replay_traces.py traces/ [--llm-latency none] [--allow-prompt-drift] [--max-p95-regression 10]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import app.services.llm_service as llm_service  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.warmup import warm_up  # noqa: E402
+from app.services.trace_capture import capture_trace, prompt_hash  # noqa: E402
+from app.utils.validators import ParsingError  # noqa: E402
+
+STAGES = ("read", "extract", "parse", "llm_parse", "llm", "postprocess")
+REPLAYED_STAGES = ("llm_parse", "llm", "postprocess")
+
+
+class _Response:
+    def __init__(self, content: str) -> None:
+        self.content = content
+
+
+class _RecordedLLM:
+    """Answers with the recorded completion for the hash of the prompt it is sent."""
+
+    def __init__(
+        self, completions: Dict[str, str], call: Dict[str, Any], args: argparse.Namespace, stats: Dict[str, int]
+    ) -> None:
+        self.completions = completions
+        self.call = call
+        self.args = args
+        self.stats = stats
+
+    async def ainvoke(self, messages: Any) -> _Response:
+        completion = self.completions.get(prompt_hash(messages))
+        if completion is None:
+            self.stats["prompt_drift"] += 1
+            if not self.args.allow_prompt_drift:
+                raise KeyError("No recorded completion for this prompt")
+            completion = self.completions[self.call["prompt_hash"]]
+        if self.args.llm_latency == "recorded":
+            await asyncio.sleep(self.call["latency_ms"] / 1000)
+        return _Response(completion)
+
+
+def _load(paths: List[Path]) -> List[Dict[str, Any]]:
+    files = [file for path in paths for file in (sorted(path.glob("*.jsonl")) if path.is_dir() else [path])]
+    return [json.loads(line) for file in files for line in file.read_text(encoding="utf-8").splitlines() if line]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * percentile / 100) - 1)]
+
+
+async def _replay(traces: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, List[float]]:
+    settings = get_settings()
+    settings.llm_hedge_enabled = False
+    # Import the lazily loaded dependencies first, as the service does at start-up.
+    await warm_up()
+    stats = {"calls": 0, "failed": 0, "prompt_drift": 0}
+    replayed: Dict[str, List[float]] = {stage: [] for stage in REPLAYED_STAGES}
+    original_build_llm = llm_service._build_llm
+    try:
+        for recorded in traces:
+            async with capture_trace(force=True) as trace:
+                for call in recorded["llm_calls"]:
+                    stats["calls"] += 1
+                    settings.llm_output_format = call["wire_format"]
+                    llm_service._build_llm = lambda model, max_tokens=None, call=call: _RecordedLLM(
+                        recorded["completions"], call, args, stats
+                    )
+                    try:
+                        await llm_service.parse_resume_with_llm(
+                            call["input"]["text"], call["input"]["hyperlinks"], call["input"]["page_count"]
+                        )
+                    except ParsingError:
+                        stats["failed"] += 1
+            for stage in REPLAYED_STAGES:
+                if stage in trace.stages_ms:
+                    replayed[stage].append(trace.stages_ms[stage])
+    finally:
+        llm_service._build_llm = original_build_llm
+    print(f"{len(traces)} traces, {stats['calls']} LLM calls replayed, {stats['failed']} failed, "
+          f"{stats['prompt_drift']} prompt hash misses")
+    return replayed
+
+
+def _report(traces: List[Dict[str, Any]], replayed: Dict[str, List[float]], max_regression: float | None) -> int:
+    incremental = sum(1 for trace in traces if trace.get("incremental_parse_enabled"))
+    print(f"{incremental} traces recorded with incremental parsing (parse includes the parse store), "
+          f"{len(traces) - incremental} without")
+    print(f"{'stage':<12}{'recorded p50':>14}{'p95':>10}{'replayed p50':>16}{'p95':>10}{'p95 change':>12}")
+    regressions = 0
+    for stage in STAGES:
+        recorded = [trace["stages_ms"][stage] for trace in traces if stage in trace["stages_ms"]]
+        if not recorded:
+            continue
+        line = f"{stage:<12}{_percentile(recorded, 50):12.1f}ms{_percentile(recorded, 95):8.1f}ms"
+        values = replayed.get(stage)
+        if values:
+            change = _percentile(values, 95) / _percentile(recorded, 95) - 1 if _percentile(recorded, 95) else 0.0
+            line += f"{_percentile(values, 50):14.1f}ms{_percentile(values, 95):8.1f}ms{change:+11.0%}"
+            if max_regression is not None and change * 100 > max_regression:
+                regressions += 1
+        else:
+            line += f"{'not replayed':>26}"
+        print(line)
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces", type=Path, nargs="+", help="trace files or directories of *.jsonl files")
+    parser.add_argument("--llm-latency", choices=("recorded", "none"), default="recorded")
+    parser.add_argument("--allow-prompt-drift", action="store_true")
+    parser.add_argument(
+        "--max-p95-regression", type=float, default=None,
+        help="exit with status 1 if a replayed stage's p95 grows by more than this many percent",
+    )
+    args = parser.parse_args()
+
+    traces = [trace for trace in _load(args.traces) if trace["llm_calls"]]
+    if not traces:
+        raise SystemExit("No traces with LLM calls found")
+    replayed = asyncio.run(_replay(traces, args))
+    sys.exit(_report(traces, replayed, args.max_p95_regression))
+
+
+if __name__ == "__main__":
+    main()
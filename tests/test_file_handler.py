@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import io
+import time
+import zlib
+from typing import Iterator, List
+
+import pytest
+from pdfminer.pdftypes import PDFStream
+from pdfminer.psparser import LIT
+
+import app.utils.file_handler as file_handler
+from app.utils.file_handler import ExtractionLimits, _decoded_stream_size, _extract_pdf_with_links
+from scripts.bench_upload_memory import serialize_pdf
+
+FONT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+IMAGE = (
+    b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8 /Length 1 >>"
+    b"\nstream\n\x00\nendstream"
+)
+
+
+def stream(data: bytes, flate: bool = False) -> bytes:
+    if flate:
+        data = zlib.compress(data, 9)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data)
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+class PdfBuilder:
+    """Builds a PDF page by page; objects 1 to 3 are the catalog, page tree and font."""
+
+    def __init__(self) -> None:
+        self.objects: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", FONT]
+        self.kids: List[int] = []
+
+    def _add(self, obj: bytes) -> int:
+        self.objects.append(obj)
+        return len(self.objects)
+
+    def _page(self, content_id: int, resources: bytes) -> None:
+        self.kids.append(
+            self._add(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R /Resources %s >>"
+                % (content_id, resources)
+            )
+        )
+
+    def text_page(self, text: str) -> "PdfBuilder":
+        content = b"BT /F1 10 Tf 50 780 Td (%s) Tj ET" % text.encode("latin-1")
+        self._page(self._add(stream(content)), b"<< /Font << /F1 3 0 R >> >>")
+        return self
+
+    def image_page(self) -> "PdfBuilder":
+        image_id = self._add(IMAGE)
+        content_id = self._add(stream(b"q 100 0 0 100 50 600 cm /Im1 Do Q"))
+        self._page(content_id, b"<< /XObject << /Im1 %d 0 R >> >>" % image_id)
+        return self
+
+    def drawing_page(self, decoded_bytes: int) -> "PdfBuilder":
+        """A page whose Flate content stream is tiny but decodes to ``decoded_bytes`` of path operators."""
+        operators = b"0 0 m 1 1 l S\n"
+        content = operators * (decoded_bytes // len(operators) + 1)
+        self._page(self._add(stream(content, flate=True)), b"<< >>")
+        return self
+
+    def build(self) -> io.BytesIO:
+        self.objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % kid for kid in self.kids),
+            len(self.kids),
+        )
+        return io.BytesIO(serialize_pdf(self.objects))
+
+
+def limits(**overrides: float) -> ExtractionLimits:
+    values = {"max_pages": 20, "max_chars": 60000, "max_cpu_seconds": 5.0, "max_page_content_bytes": 64 * 1024}
+    values.update(overrides)
+    return ExtractionLimits(**values)  # type: ignore[arg-type]
+
+
+def test_small_document_is_extracted_in_full() -> None:
+    pdf = PdfBuilder().text_page("Jane Doe").text_page("Experience").build()
+
+    document = _extract_pdf_with_links(pdf, limits())
+
+    assert document.text == "Jane Doe\nExperience"
+    assert document.page_count == 2
+    assert not document.truncated
+    assert document.stats["pages_extracted"] == 2
+    assert document.stats["pages_skipped"] == {}
+    assert document.stats["truncated_by"] is None
+
+
+def test_page_cap_stops_at_max_pages() -> None:
+    pdf = PdfBuilder().text_page("Page one").text_page("Page two").text_page("Page three").build()
+
+    document = _extract_pdf_with_links(pdf, limits(max_pages=2))
+
+    assert document.text == "Page one\nPage two"
+    assert document.page_count == 3
+    assert document.stats["pages_extracted"] == 2
+    assert document.stats["truncated_by"] == "pages"
+
+
+def test_character_cap_cuts_the_text() -> None:
+    pdf = PdfBuilder().text_page("A" * 40).text_page("B" * 40).text_page("C" * 40).build()
+
+    document = _extract_pdf_with_links(pdf, limits(max_chars=60))
+
+    assert document.text == "A" * 40 + "\n" + "B" * 19
+    assert document.stats["pages_extracted"] == 2
+    assert document.stats["truncated_by"] == "chars"
+
+
+@pytest.fixture
+def cpu_clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make every ``thread_time`` reading one CPU second later than the previous one."""
+    ticks: Iterator[int] = iter(range(1000))
+    monkeypatch.setattr(file_handler.time, "thread_time", lambda: float(next(ticks)))
+
+
+def test_cpu_budget_stops_between_pages(cpu_clock: None) -> None:
+    pdf = PdfBuilder().text_page("Page one").text_page("Page two").text_page("Page three").build()
+
+    # Readings: start 0, before page one 1, before page two 2 (over budget).
+    document = _extract_pdf_with_links(pdf, limits(max_cpu_seconds=1.5))
+
+    assert document.text == "Page one"
+    assert document.stats["pages_extracted"] == 1
+    assert document.stats["truncated_by"] == "cpu_time"
+
+
+def test_image_only_and_oversized_pages_are_skipped() -> None:
+    pdf = PdfBuilder().text_page("Jane Doe").image_page().drawing_page(1024 * 1024).text_page("Skills").build()
+
+    document = _extract_pdf_with_links(pdf, limits())
+
+    assert document.text == "Jane Doe\nSkills"
+    assert document.stats["pages_extracted"] == 2
+    assert document.stats["pages_skipped"] == {"image_only": 1, "oversized": 1}
+    assert document.stats["truncated_by"] is None
+
+
+def test_decompression_bomb_page_is_skipped_without_decoding_it() -> None:
+    # 40 MB of drawing operators compress below the page cap, so only the
+    # decoded size reveals the page.
+    cap = 128 * 1024
+    pdf = PdfBuilder().drawing_page(40 * 1024 * 1024).text_page("Jane Doe").build()
+    assert pdf.getbuffer().nbytes < cap
+
+    start_time = time.perf_counter()
+    document = _extract_pdf_with_links(pdf, limits(max_page_content_bytes=cap))
+
+    assert time.perf_counter() - start_time < 2
+    assert document.text == "Jane Doe"
+    assert document.stats["pages_skipped"] == {"oversized": 1}
+
+
+def test_decoded_stream_size_stops_decompressing_past_the_cap() -> None:
+    data = zlib.compress(b"0" * 10 * 1024 * 1024)
+    flate = PDFStream({"Filter": LIT("FlateDecode"), "Length": len(data)}, data)
+    plain = PDFStream({"Length": 5}, b"q Q\n\n")
+
+    assert _decoded_stream_size(flate, 1000) == 1001
+    assert _decoded_stream_size(plain, 1000) == 5
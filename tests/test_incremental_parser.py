@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+import app.services.incremental_parser as incremental_parser
+from app.core.config import Settings
+from app.core.metrics import metrics
+from app.schemas.resume_schema import ResumeSchema
+from app.services.parse_store import ParseStore
+from app.services.sections import HEADER_SECTION, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer.
+
+Experience
+Example Corp, 2019 - 2024
+
+Skills
+Python, SQL
+"""
+
+LINKS = [{"text": "LinkedIn", "url": "https://linkedin.com/in/jane"}]
+
+
+class FakeLLM:
+    """Stands in for ``parse_resume_with_llm``; every field it returns is tagged with the call number."""
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+
+    async def __call__(
+        self, resume_text: str, hyperlinks: Optional[List[Dict[str, str]]] = None, page_count: Optional[int] = None
+    ) -> ResumeSchema:
+        self.texts.append(resume_text)
+        tag = f"call-{len(self.texts)}"
+        return ResumeSchema.model_validate(
+            {
+                "personal_information": {"full_name": tag, "linkedin": (hyperlinks or [{}])[0].get("url")},
+                "professional_summary": tag,
+                "work_experience": [{"company": tag}],
+                "skills": {"languages": [tag]},
+            }
+        )
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def settings(monkeypatch: pytest.MonkeyPatch) -> Settings:
+    settings = Settings(
+        groq_api_key="test",
+        internal_api_key="test",
+        max_file_size_mb=5,
+        allowed_file_types="pdf,docx",
+        llm_output_format="full",
+    )
+    monkeypatch.setattr(incremental_parser, "get_settings", lambda: settings)
+    return settings
+
+
+@pytest.fixture
+def llm(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, settings: Settings) -> FakeLLM:
+    fake = FakeLLM()
+    store = ParseStore(str(tmp_path / "parse_store.sqlite3"), max_parses_per_user=5)
+    monkeypatch.setattr(incremental_parser, "parse_resume_with_llm", fake)
+    monkeypatch.setattr(incremental_parser, "get_parse_store", lambda: store)
+    metrics.reset()
+    return fake
+
+
+def mode_counts() -> Dict[str, int]:
+    counters = metrics.snapshot()["counters"]
+    return {mode: counters.get(f"incremental.{mode}", 0) for mode in ("full", "partial", "reuse")}
+
+
+async def parse(text: str, hyperlinks: List[Dict[str, str]] = LINKS, previous: Optional[str] = None) -> Dict[str, Any]:
+    resume, _ = await incremental_parser.parse_incrementally("user-1", text, hyperlinks, previous)
+    return resume.model_dump()
+
+
+@pytest.mark.anyio
+async def test_first_parse_is_full(llm: FakeLLM) -> None:
+    result = await parse(RESUME)
+
+    assert llm.texts == [RESUME]
+    assert result["personal_information"]["full_name"] == "call-1"
+    assert mode_counts() == {"full": 1, "partial": 0, "reuse": 0}
+
+
+@pytest.mark.anyio
+async def test_changed_section_is_reparsed_and_merged_with_stored_fragments(llm: FakeLLM) -> None:
+    await parse(RESUME)
+    result = await parse(RESUME.replace("2019 - 2024", "2019 - 2025"))
+
+    assert llm.texts[1] == "Experience\nExample Corp, 2019 - 2025"
+    assert result["work_experience"][0]["company"] == "call-2"
+    assert result["personal_information"]["full_name"] == "call-1"
+    assert result["professional_summary"] == "call-1"
+    assert result["skills"]["languages"] == ["call-1"]
+    assert mode_counts() == {"full": 1, "partial": 1, "reuse": 0}
+
+
+@pytest.mark.anyio
+async def test_unchanged_resume_reuses_the_stored_parse(llm: FakeLLM) -> None:
+    first = await parse(RESUME)
+    # Whitespace-only differences do not change a section's hash.
+    second = await parse(RESUME.replace("Python, SQL", "Python,   SQL  "))
+
+    assert len(llm.texts) == 1
+    assert second == first
+    assert mode_counts() == {"full": 1, "partial": 0, "reuse": 1}
+
+
+@pytest.mark.anyio
+async def test_hyperlink_change_invalidates_the_header(llm: FakeLLM) -> None:
+    await parse(RESUME)
+    result = await parse(RESUME, [{"text": "LinkedIn", "url": "https://linkedin.com/in/jane-doe"}])
+
+    assert llm.texts[1] == split_sections(RESUME)[HEADER_SECTION]
+    assert result["personal_information"]["full_name"] == "call-2"
+    assert result["personal_information"]["linkedin"] == "https://linkedin.com/in/jane-doe"
+    assert result["work_experience"][0]["company"] == "call-1"
+
+
+@pytest.mark.anyio
+async def test_fields_of_absent_sections_follow_the_header(llm: FakeLLM) -> None:
+    text = RESUME.replace("Summary\nBackend engineer.\n", "")
+    await parse(text)
+    result = await parse(text.replace("jane@example.com", "jane@example.org"))
+
+    assert result["professional_summary"] == "call-2"
+    assert result["skills"]["languages"] == ["call-1"]
+
+
+@pytest.mark.anyio
+async def test_prompt_change_forces_a_full_parse(llm: FakeLLM, settings: Settings) -> None:
+    await parse(RESUME)
+    settings.llm_output_format = "compact"
+    result = await parse(RESUME)
+
+    assert llm.texts == [RESUME, RESUME]
+    assert result["skills"]["languages"] == ["call-2"]
+    assert mode_counts() == {"full": 2, "partial": 0, "reuse": 0}
+
+
+@pytest.mark.anyio
+async def test_changed_section_set_forces_a_full_parse(llm: FakeLLM) -> None:
+    await parse(RESUME)
+    await parse(RESUME + "\nProjects\nResume parser\n")
+
+    assert mode_counts() == {"full": 2, "partial": 0, "reuse": 0}
+
+
+@pytest.mark.anyio
+async def test_unknown_previous_parse_id_falls_back_to_a_full_parse(llm: FakeLLM) -> None:
+    await parse(RESUME)
+    await parse(RESUME, previous="missing")
+
+    assert mode_counts() == {"full": 2, "partial": 0, "reuse": 0}
+
+
+def test_split_sections_concatenates_repeated_headings() -> None:
+    sections = split_sections(
+        "Jane Doe\nExperience\nFirst Corp\nAwards\nBest engineer\nWork History\nSecond Corp\nLanguages\nFrench\n"
+    )
+
+    assert list(sections) == [HEADER_SECTION, "experience", "additional"]
+    assert sections[HEADER_SECTION] == "Jane Doe"
+    assert sections["experience"] == "Experience\nFirst Corp\nWork History\nSecond Corp"
+    assert sections["additional"] == "Awards\nBest engineer\nLanguages\nFrench"
+
+
+def test_split_sections_keeps_an_empty_header_and_drops_empty_sections() -> None:
+    sections = split_sections("Skills\n\nEducation\nState University\n")
+
+    assert sections == {HEADER_SECTION: "", "education": "Education\nState University"}
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from app.core.config import Settings
+from app.core.metrics import metrics
+from app.services.llm_policy import LLMRequestPolicy, model_latency_series
+from app.utils.validators import ServiceUnavailableError
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+
+def make_settings(**overrides: Any) -> Settings:
+    values: Dict[str, Any] = {
+        "groq_api_key": "test",
+        "internal_api_key": "test",
+        "max_file_size_mb": 5,
+        "allowed_file_types": "pdf,docx",
+        "llm_hedge_enabled": False,
+        "llm_max_retries": 2,
+        "llm_backoff_base_seconds": 0.0,
+        "llm_circuit_failure_threshold": 100,
+        "llm_circuit_reset_seconds": 30,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def recording_invoke(behaviour: Callable[[str, int], Any]) -> tuple[Callable[[str], Any], List[str]]:
+    """Build an ``invoke`` whose n-th call is handled by ``behaviour(model, n)``; it records the models called."""
+    calls: List[str] = []
+
+    async def invoke(model: str) -> Any:
+        calls.append(model)
+        result = behaviour(model, len(calls))
+        if asyncio.iscoroutine(result):
+            result = await result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return invoke, calls
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics() -> None:
+    metrics.reset()
+
+
+def counter(name: str) -> int:
+    return metrics.snapshot()["counters"].get(name, 0)
+
+
+@pytest.mark.anyio
+async def test_hedge_fires_and_wins_when_primary_is_slow() -> None:
+    for _ in range(20):
+        metrics.observe(model_latency_series("model-a"), 10)
+    settings = make_settings(llm_hedge_enabled=True, llm_hedge_min_samples=20, llm_hedge_min_delay_seconds=0.01)
+
+    async def behaviour(model: str, call: int) -> str:
+        if call == 1:
+            await asyncio.sleep(5)
+            return "primary"
+        return "hedge"
+
+    invoke, calls = recording_invoke(behaviour)
+
+    assert await LLMRequestPolicy().run(invoke, ["model-a"], settings) == "hedge"
+    assert calls == ["model-a", "model-a"]
+    assert counter("llm.hedge.fired") == 1
+    assert counter("llm.hedge.won") == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_primary_records_its_elapsed_time() -> None:
+    for _ in range(20):
+        metrics.observe(model_latency_series("model-a"), 10)
+    settings = make_settings(llm_hedge_enabled=True, llm_hedge_min_samples=20, llm_hedge_min_delay_seconds=0.05)
+
+    async def behaviour(model: str, call: int) -> str:
+        if call == 1:
+            await asyncio.sleep(5)
+            return "primary"
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    invoke, _ = recording_invoke(behaviour)
+
+    assert await LLMRequestPolicy().run(invoke, ["model-a"], settings) == "hedge"
+    samples, slowest_ms = metrics.percentile(model_latency_series("model-a"), 100)
+    assert samples == 22
+    # The primary ran for the hedge delay plus the hedge's latency before it was cancelled.
+    assert slowest_ms >= 100
+
+
+@pytest.mark.anyio
+async def test_hedge_delay_uses_the_model_latency_history() -> None:
+    for _ in range(20):
+        metrics.observe(model_latency_series("model-fast"), 10)
+    settings = make_settings(llm_hedge_enabled=True, llm_hedge_min_samples=20, llm_hedge_min_delay_seconds=0.01)
+    policy = LLMRequestPolicy()
+
+    async def behaviour(model: str, call: int) -> str:
+        await asyncio.sleep(0.1)
+        return model
+
+    invoke, calls = recording_invoke(behaviour)
+
+    assert policy.hedge_delay("model-slow", settings) is None
+    assert await policy.run(invoke, ["model-slow"], settings) == "model-slow"
+    assert calls == ["model-slow"]
+    assert counter("llm.hedge.fired") == 0
+    assert policy.hedge_delay("model-fast", settings) == pytest.approx(0.01)
+
+
+@pytest.mark.anyio
+async def test_retryable_error_retries_then_falls_back() -> None:
+    invoke, calls = recording_invoke(lambda model, call: FakeAPIError(503) if model == "model-a" else "ok")
+
+    assert await LLMRequestPolicy().run(invoke, ["model-a", "model-b"], make_settings()) == "ok"
+    assert calls == ["model-a", "model-a", "model-a", "model-b"]
+    assert counter("llm.retries") == 2
+    assert counter("llm.fallbacks") == 1
+
+
+@pytest.mark.anyio
+async def test_non_retryable_error_skips_retries() -> None:
+    invoke, calls = recording_invoke(lambda model, call: FakeAPIError(400) if model == "model-a" else "ok")
+
+    assert await LLMRequestPolicy().run(invoke, ["model-a", "model-b"], make_settings()) == "ok"
+    assert calls == ["model-a", "model-b"]
+    assert counter("llm.retries") == 0
+
+
+@pytest.mark.anyio
+async def test_last_error_is_raised_when_every_model_fails() -> None:
+    invoke, _ = recording_invoke(lambda model, call: FakeAPIError(400))
+
+    with pytest.raises(FakeAPIError):
+        await LLMRequestPolicy().run(invoke, ["model-a", "model-b"], make_settings())
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_consecutive_failures() -> None:
+    settings = make_settings(llm_max_retries=0, llm_circuit_failure_threshold=3)
+    policy = LLMRequestPolicy()
+    invoke, calls = recording_invoke(lambda model, call: FakeAPIError(503))
+
+    for _ in range(3):
+        with pytest.raises(FakeAPIError):
+            await policy.run(invoke, ["model-a"], settings)
+    with pytest.raises(ServiceUnavailableError):
+        await policy.run(invoke, ["model-a"], settings)
+
+    assert len(calls) == 3
+    assert counter("llm.circuit.opened") == 1
+    assert counter("llm.circuit.rejected") == 1
+
+
+def open_breaker(policy: LLMRequestPolicy, settings: Settings) -> None:
+    for _ in range(settings.llm_circuit_failure_threshold):
+        policy.breaker.record_failure(settings.llm_circuit_failure_threshold)
+    policy.breaker.opened_at -= settings.llm_circuit_reset_seconds
+
+
+@pytest.mark.anyio
+async def test_half_open_breaker_lets_a_single_probe_through() -> None:
+    settings = make_settings(llm_max_retries=0, llm_circuit_failure_threshold=1)
+    policy = LLMRequestPolicy()
+    open_breaker(policy, settings)
+
+    async def behaviour(model: str, call: int) -> str:
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    invoke, calls = recording_invoke(behaviour)
+    results = await asyncio.gather(
+        *(policy.run(invoke, ["model-a"], settings) for _ in range(3)), return_exceptions=True
+    )
+
+    assert results.count("ok") == 1
+    assert sum(isinstance(result, ServiceUnavailableError) for result in results) == 2
+    assert len(calls) == 1
+    assert policy.breaker.opened_at is None
+
+
+@pytest.mark.anyio
+async def test_failed_probe_reopens_breaker() -> None:
+    settings = make_settings(llm_max_retries=0, llm_circuit_failure_threshold=1)
+    policy = LLMRequestPolicy()
+    open_breaker(policy, settings)
+    invoke, calls = recording_invoke(lambda model, call: FakeAPIError(503))
+
+    with pytest.raises(FakeAPIError):
+        await policy.run(invoke, ["model-a"], settings)
+    with pytest.raises(ServiceUnavailableError):
+        await policy.run(invoke, ["model-a"], settings)
+
+    assert len(calls) == 1
+    assert not policy.breaker.probing
+
+
+@pytest.mark.anyio
+async def test_probe_ending_in_non_retryable_error_releases_half_open_state() -> None:
+    settings = make_settings(llm_max_retries=0, llm_circuit_failure_threshold=1)
+    policy = LLMRequestPolicy()
+    open_breaker(policy, settings)
+    invoke, calls = recording_invoke(lambda model, call: FakeAPIError(400) if call == 1 else "ok")
+
+    with pytest.raises(FakeAPIError):
+        await policy.run(invoke, ["model-a"], settings)
+    assert await policy.run(invoke, ["model-a"], settings) == "ok"
+
+    assert len(calls) == 2
+    assert policy.breaker.opened_at is None
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional
+
+import pytest
+
+import app.services.llm_service as llm_service
+from app.core.config import ModelRoute, Settings
+from app.core.metrics import metrics
+from app.utils.validators import ParsingError
+
+COMPLETION = json.dumps({"personal_information": {"full_name": "Jane Doe"}})
+
+
+class FakeResponse:
+    def __init__(self, content: str, finish_reason: str) -> None:
+        self.content = content
+        self.response_metadata = {"finish_reason": finish_reason}
+
+
+class FakeChatModel:
+    """Cuts the completion short with finish reason ``length`` when ``max_tokens`` is set, or always if told to."""
+
+    def __init__(self, max_tokens: Optional[int], calls: List[Optional[int]], always_truncate: bool) -> None:
+        self.max_tokens = max_tokens
+        self.calls = calls
+        self.always_truncate = always_truncate
+
+    async def ainvoke(self, messages: Any) -> FakeResponse:
+        self.calls.append(self.max_tokens)
+        if self.max_tokens is not None or self.always_truncate:
+            return FakeResponse(COMPLETION[: len(COMPLETION) // 2], "length")
+        return FakeResponse(COMPLETION, "stop")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def settings(monkeypatch: pytest.MonkeyPatch) -> Settings:
+    settings = Settings(
+        groq_api_key="test",
+        internal_api_key="test",
+        max_file_size_mb=5,
+        allowed_file_types="pdf,docx",
+        llm_output_format="full",
+        llm_hedge_enabled=False,
+        llm_routes=[ModelRoute(name="short", max_tokens=64)],
+    )
+    monkeypatch.setattr(llm_service, "get_settings", lambda: settings)
+    metrics.reset()
+    return settings
+
+
+def stub_chat_model(monkeypatch: pytest.MonkeyPatch, always_truncate: bool = False) -> List[Optional[int]]:
+    """Replace the chat model and return the ``max_tokens`` of every call made to it."""
+    calls: List[Optional[int]] = []
+    monkeypatch.setattr(
+        llm_service, "_build_llm", lambda model, max_tokens=None: FakeChatModel(max_tokens, calls, always_truncate)
+    )
+    return calls
+
+
+@pytest.mark.anyio
+async def test_truncated_completion_is_retried_without_the_route_cap(
+    settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = stub_chat_model(monkeypatch)
+
+    resume = await llm_service.parse_resume_with_llm("Jane Doe")
+
+    assert resume.personal_information.full_name == "Jane Doe"
+    assert calls == [64, None]
+    assert metrics.snapshot()["counters"]["llm.route_truncated.short"] == 1
+
+
+@pytest.mark.anyio
+async def test_uncapped_truncation_is_not_retried(settings: Settings, monkeypatch: pytest.MonkeyPatch) -> None:
+    settings.llm_routes = []
+    calls = stub_chat_model(monkeypatch, always_truncate=True)
+
+    with pytest.raises(ParsingError):
+        await llm_service.parse_resume_with_llm("Jane Doe")
+
+    assert calls == [None]
+    assert not any(name.startswith("llm.route_truncated") for name in metrics.snapshot()["counters"])
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.parse_store import ParseStore, StoredParse
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def stored(parse_id: str) -> StoredParse:
+    return StoredParse(parse_id, "v1", {"header": {"hash": "h", "fragment": {"personal_information": {}}}})
+
+
+def age(path: Path, parse_id: str, seconds: float) -> None:
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE parses SET created_at = ? WHERE parse_id = ?", (time.time() - seconds, parse_id))
+
+
+def row_counts(path: Path) -> tuple[int, int]:
+    with sqlite3.connect(path) as connection:
+        return (
+            connection.execute("SELECT COUNT(*) FROM parses").fetchone()[0],
+            connection.execute("SELECT COUNT(*) FROM parse_sections").fetchone()[0],
+        )
+
+
+@pytest.mark.anyio
+async def test_expired_parses_are_not_loaded_and_are_pruned_on_save(tmp_path: Path) -> None:
+    path = tmp_path / "parse_store.sqlite3"
+    store = ParseStore(str(path), max_parses_per_user=5, ttl_seconds=3600)
+    await store.save("user-1", stored("old"))
+    age(path, "old", 7200)
+
+    assert await store.load("user-1") is None
+    assert await store.load("user-1", "old") is None
+
+    await store.save("user-2", stored("new"))
+    assert row_counts(path) == (1, 1)
+    assert (await store.load("user-2")).parse_id == "new"
+
+
+@pytest.mark.anyio
+async def test_each_user_keeps_the_latest_parses(tmp_path: Path) -> None:
+    path = tmp_path / "parse_store.sqlite3"
+    store = ParseStore(str(path), max_parses_per_user=2)
+    for index in range(3):
+        await store.save("user-1", stored(f"parse-{index}"))
+        age(path, f"parse-{index}", 10 - index)
+
+    assert row_counts(path) == (2, 2)
+    assert (await store.load("user-1")).parse_id == "parse-2"
+    assert await store.load("user-1", "parse-0") is None
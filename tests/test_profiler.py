@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from app.services.profiler import SamplingProfiler
+
+
+def uvloop_factory() -> Callable[[], Any]:
+    return pytest.importorskip("uvloop").new_event_loop
+
+
+@pytest.mark.parametrize("loop_factory", [lambda: asyncio.new_event_loop, uvloop_factory], ids=["asyncio", "uvloop"])
+def test_idle_event_loop_is_not_sampled(loop_factory: Callable[[], Callable[[], Any]]) -> None:
+    profiler = SamplingProfiler(0.005)
+
+    async def idle() -> None:
+        profiler.start()
+        await asyncio.sleep(0.3)
+
+    with asyncio.Runner(loop_factory=loop_factory()) as runner:
+        runner.run(idle())
+    profiler.stop()
+
+    main_thread_samples = sum(count for stack, count in profiler.samples.items() if stack.startswith("MainThread;"))
+    assert profiler.idle_samples > 20
+    # Leaving the loop and stopping the profiler may be caught running.
+    assert main_thread_samples <= 2
+
+
+def test_busy_event_loop_is_sampled() -> None:
+    profiler = SamplingProfiler(0.005)
+
+    async def busy() -> None:
+        profiler.start()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 0.3
+        while loop.time() < deadline:
+            pass
+
+    with asyncio.Runner(loop_factory=uvloop_factory()) as runner:
+        runner.run(busy())
+    profiler.stop()
+
+    assert any(stack.endswith("busy") for stack in profiler.samples)